@@ -1,28 +1,50 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import Depends, status
+from fastapi import Depends, Query, status
 from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.auth.router import login_router
+from app.crud.profiles import LoadProfile
+from app.crud.user import get_user_by_id
 from app.db.postgres import get_session
-from app.models.publication.user import User
-from app.schema.auth.token import Token
-from app.schema.auth.user import UserResponse
+from app.db.replicas import get_read_session
+from app.schema.auth.token import Principal, Token
+from app.schema.auth.user import AuthorResponse, UserResponse, serialize_author
 from app.utils.auth.jwt import authenticate_user, create_access_token, get_current_user, oauth2_scheme
+from app.utils.exceptions import UserNotFoundError, handle_domain_error
 from conf.config import settings
 
 
 @login_router.get('/users/me', response_model=UserResponse, status_code=status.HTTP_200_OK)
 async def read_users_me(
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: AsyncSession = Depends(get_session),
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ) -> ORJSONResponse:
     return ORJSONResponse(UserResponse.model_validate(current_user, from_attributes=True).model_dump(mode='json'))
 
 
+@login_router.get(
+    '/users/{user_id}',
+    response_model=AuthorResponse,
+    description='Возвращает пользователя и `limit` его последних публикаций начиная со `skip`',
+    status_code=status.HTTP_200_OK,
+)
+@handle_domain_error
+async def read_author(
+    user_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.PUBLICATIONS_PAGE_SIZE_MAX),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
+    author = await get_user_by_id(session, user_id, LoadProfile.AUTHOR, skip, limit)
+    if author is None:
+        raise UserNotFoundError(user_id)
+
+    return ORJSONResponse(serialize_author(author))
+
+
 @login_router.post('/info')
 async def info(
     access_token: Annotated[str, Depends(oauth2_scheme)],
@@ -31,6 +53,7 @@ async def info(
 
 
 @login_router.post('/token', response_model=Token)
+@handle_domain_error
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: AsyncSession = Depends(get_session),
@@ -39,7 +62,7 @@ async def login_for_access_token(
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={'sub': user.username},
+        data={'sub': user.username, 'uid': user.id},
         expires_delta=access_token_expires,
     )
     return Token(access_token=access_token, token_type='bearer')
@@ -6,6 +6,7 @@ from app.api.v1.auth.router import login_router
 from app.crud.user import create_user
 from app.db.postgres import get_session
 from app.schema.auth.user import UserDTO, UserResponse
+from app.utils.auth.password import hash_password
 from app.utils.exceptions import handle_domain_error
 
 
@@ -19,7 +20,7 @@ async def registration(
     payload: UserDTO,
     session: AsyncSession = Depends(get_session),
 ) -> ORJSONResponse:
-    new_user = await create_user(session, payload.model_dump())
+    new_user = await create_user(session, {**payload.model_dump(), 'password': await hash_password(payload.password)})
     return ORJSONResponse(
         UserResponse.model_validate(new_user, from_attributes=True).model_dump(mode='json'),
         status_code=status.HTTP_201_CREATED,
@@ -1,45 +1,108 @@
-from typing import Annotated
+from typing import Annotated, Any, AsyncContextManager, Callable
 
-from fastapi import Depends, HTTPException, status
+import orjson
+from fastapi import Depends, Query, Response, status
 from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.publication.router import publication_router
-from app.cache.cache import redis_drop_key, redis_get, redis_set
-from app.crud.publication import (
-    create_new_publication,
-    get_publication_by_id,
-    get_publications,
-    update_or_create_publication,
+from app.cache.cache import redis_get_many, redis_get_many_raw, redis_get_or_load, redis_set_many, redis_set_many_raw
+from app.cache.invalidation import publication_created, publication_deleted, publication_updated, publication_voted
+from app.cache.leaderboard import leaderboard_top
+from app.cache.ranking import get_ranking_generation, redis_get_page, redis_set_page
+from app.cache.vote_buffer import buffer_vote
+from app.crud.publication import create_new_publication, delete_publication_by_id, update_or_create_publication
+from app.crud.publication_read import (
+    read_publication_detail,
+    read_publication_details_by_ids,
+    read_publications,
+    read_publications_by_ids,
 )
 from app.crud.vote import create_or_update_vote
 from app.db.postgres import get_session
-from app.models.publication.user import User
-from app.schema.publication.publication import NewPublication, Publication, PublicationDTO, VoteForPublication
-from app.utils.auth.jwt import get_current_user
+from app.db.replicas import get_read_session, get_read_session_factory
+from app.schema.auth.token import Principal
+from app.schema.publication.publication import (
+    NewPublication,
+    Publication,
+    PublicationSummaryDTO,
+    VoteForPublication,
+    serialize_publication,
+    serialize_publication_summary,
+)
+from app.utils.auth.jwt import get_current_writer
 from app.utils.exceptions import handle_domain_error
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from conf.config import settings
 
 
 @publication_router.get(
     '',
-    description='Возвращает `limit` лучших публикаций начиная со `skip`',
+    description=(
+        'Возвращает `limit` лучших публикаций начиная со `skip` или после `cursor`. '
+        f'Курсор следующей страницы передается в заголовке `{NEXT_CURSOR_HEADER}`'
+    ),
     summary='Top publications',
     status_code=status.HTTP_200_OK,
 )
 @handle_domain_error
 async def get_top_publications(
-    session: AsyncSession = Depends(get_session),
-    skip: int = 0,
-    limit: int = 10,
+    session: AsyncSession = Depends(get_read_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.PUBLICATIONS_PAGE_SIZE_MAX),
+    cursor: str | None = Query(None, description='Курсор из заголовка предыдущей страницы'),
 ) -> ORJSONResponse:
-    publications = await get_publications(session, skip, limit)
-
-    return ORJSONResponse(
-        [
-            PublicationDTO.model_validate(publication, from_attributes=True).model_dump(mode='json')
-            for publication in publications
-        ]
-    )
+    if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        # Cursors and offsets are kept apart, a cursor must never hit a cached offset page
+        page = f'{limit}:c:{cursor}' if cursor else f'{limit}:s:{skip}'
+        generation = await get_ranking_generation()
+        serialized_publications = await redis_get_page(PublicationSummaryDTO.__name__, generation, page)
+        if serialized_publications is None:
+            serialized_publications = await load_top_publications(session, skip, limit, cursor)
+            await redis_set_page(PublicationSummaryDTO.__name__, generation, page, serialized_publications)
+    else:
+        serialized_publications = await load_top_publications(session, skip, limit, cursor)
+
+    response = ORJSONResponse(serialized_publications)
+    if len(serialized_publications) == limit:
+        last_publication = serialized_publications[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_publication['rating'], last_publication['id'])
+
+    return response
+
+
+async def load_top_publications(
+    session: AsyncSession, skip: int, limit: int, cursor: str | None
+) -> list[dict[str, Any]]:
+    ranking = await leaderboard_top(skip, limit) if settings.LEADERBOARD_ENABLED and not cursor else None
+    if ranking is not None:
+        return await hydrate_publications(session, ranking)
+
+    after = decode_cursor(cursor) if cursor else None
+    return [
+        serialize_publication_summary(publication)
+        for publication in await read_publications(session, skip, limit, after)
+    ]
+
+
+async def hydrate_publications(session: AsyncSession, ranking: list[tuple[int, int]]) -> list[dict[str, Any]]:
+    publication_ids = [publication_id for publication_id, _ in ranking]
+    cached_publications = await redis_get_many(PublicationSummaryDTO.__name__, publication_ids)
+
+    missing_ids = [publication_id for publication_id in publication_ids if publication_id not in cached_publications]
+    if missing_ids:
+        loaded_publications = {
+            publication.id: serialize_publication_summary(publication)
+            for publication in await read_publications_by_ids(session, missing_ids)
+        }
+        await redis_set_many(PublicationSummaryDTO.__name__, loaded_publications)
+        cached_publications.update(loaded_publications)
+
+    return [
+        {**cached_publications[publication_id], 'rating': rating}
+        for publication_id, rating in ranking
+        if publication_id in cached_publications
+    ]
 
 
 @publication_router.post(
@@ -48,10 +111,11 @@ async def get_top_publications(
 @handle_domain_error
 async def create_publication(
     publication: Publication,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> ORJSONResponse:
     new_publication = await create_new_publication(session, publication.text, current_user.id)
+    await publication_created(new_publication.id)
 
     return ORJSONResponse(
         NewPublication.model_validate(new_publication, from_attributes=True).model_dump(mode='json'),
@@ -59,24 +123,68 @@ async def create_publication(
     )
 
 
+@publication_router.get(
+    '/batch',
+    description=(
+        'Возвращает публикации в порядке `ids`. Вместо отсутствующих публикаций возвращается `null`, '
+        'их идентификаторы перечислены в `not_found`'
+    ),
+    summary='Get publications',
+    status_code=status.HTTP_200_OK,
+)
+@handle_domain_error
+async def get_publications_batch(
+    ids: list[int] = Query([], min_length=1, max_length=settings.PUBLICATIONS_BATCH_SIZE_MAX),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    cached_publications = await redis_get_many_raw(Publication.__name__, list(dict.fromkeys(ids)))
+
+    missing_ids = [publication_id for publication_id in dict.fromkeys(ids) if publication_id not in cached_publications]
+    if missing_ids:
+        loaded_publications = {
+            publication.id: orjson.dumps(serialize_publication(publication))
+            for publication in await read_publication_details_by_ids(session, missing_ids)
+        }
+        await redis_set_many_raw(Publication.__name__, loaded_publications)
+        cached_publications.update(loaded_publications)
+
+    # Cached publications are embedded as they are stored, without decoding them
+    return Response(
+        orjson.dumps(
+            {
+                'items': [
+                    orjson.Fragment(cached_publications[publication_id])
+                    if publication_id in cached_publications
+                    else None
+                    for publication_id in ids
+                ],
+                'not_found': [
+                    publication_id for publication_id in missing_ids if publication_id not in cached_publications
+                ],
+            }
+        ),
+        media_type='application/json',
+    )
+
+
 @publication_router.get(
     '/{publication_id}', description='Возвращает публикацию', summary='Get publication', status_code=status.HTTP_200_OK
 )
 @handle_domain_error
 async def get_publication(
     publication_id: int,
-    session: AsyncSession = Depends(get_session),
-) -> ORJSONResponse:
-    cached_publication = await redis_get(Publication.__name__, publication_id)
-    if cached_publication:
-        return ORJSONResponse(cached_publication)
-
-    serialized_publication = PublicationDTO.model_validate(
-        await get_publication_by_id(session, publication_id), from_attributes=True
-    ).model_dump(mode='json')
-    await redis_set(Publication.__name__, publication_id, serialized_publication)
-
-    return ORJSONResponse(serialized_publication)
+    session_factory: Annotated[Callable[[], AsyncContextManager[AsyncSession]], Depends(get_read_session_factory)],
+) -> Response:
+    # The load is shared with concurrent requests for the same publication and outlives a cancelled one,
+    # so it opens its own session instead of using the one closed with this request
+    async def load_publication() -> bytes:
+        async with session_factory() as session:
+            return orjson.dumps(serialize_publication(await read_publication_detail(session, publication_id)))
+
+    # A cache hit is returned as stored, without decoding and encoding it again
+    return Response(
+        await redis_get_or_load(Publication.__name__, publication_id, load_publication), media_type='application/json'
+    )
 
 
 @publication_router.put(
@@ -89,11 +197,11 @@ async def get_publication(
 async def update_publication(
     publication_id: int,
     publication: Publication,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> ORJSONResponse:
     db_publication = await update_or_create_publication(session, publication_id, publication.text, current_user.id)
-    await redis_drop_key(Publication.__name__, publication_id)
+    await publication_updated(db_publication.id)
 
     return ORJSONResponse(
         NewPublication.model_validate(db_publication, from_attributes=True).model_dump(mode='json'),
@@ -110,11 +218,17 @@ async def update_publication(
 async def update_publication_vote(
     publication_id: int,
     vote: VoteForPublication,
-    current_user: Annotated[User, Depends(get_current_user)],
+    response: Response,
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> str:
-    await create_or_update_vote(session, publication_id, current_user.id, vote.value)
-    await redis_drop_key(Publication.__name__, publication_id)
+    if settings.VOTE_WRITE_BEHIND_ENABLED:
+        await buffer_vote(current_user.id, publication_id, vote.value)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return 'ok'
+
+    _, rating_delta = await create_or_update_vote(session, publication_id, current_user.id, vote.value)
+    await publication_voted(publication_id, rating_delta)
 
     return 'ok'
 
@@ -128,12 +242,8 @@ async def update_publication_vote(
 @handle_domain_error
 async def delete_publication(
     publication_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> None:
-    publication = await get_publication_by_id(session, publication_id)
-    if publication.author_id != current_user.id:
-        raise HTTPException(detail='Permission denied', status_code=status.HTTP_403_FORBIDDEN)
-    await session.delete(publication)
-    await session.commit()
-    await redis_drop_key(Publication.__name__, publication_id)
+    await delete_publication_by_id(session, publication_id, current_user.id)
+    await publication_deleted(publication_id)
@@ -1,31 +1,92 @@
 from typing import Annotated
 
-from fastapi import Depends, status
+from fastapi import Body, Depends, status
 from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.vote.router import vote_router
-from app.crud.vote import create_or_update_vote, get_vote_by_user_and_publication_id
+from app.cache.invalidation import publication_voted, publications_voted
+from app.cache.vote_buffer import buffer_vote, buffer_votes, drop_buffered_vote
+from app.crud.vote import create_or_update_vote, create_or_update_votes, delete_vote
 from app.db.postgres import get_session
-from app.models.publication.user import User
-from app.schema.vote.vote import Vote, VoteDTO
-from app.utils.auth.jwt import get_current_user
+from app.schema.auth.token import Principal
+from app.schema.vote.vote import Vote, VoteDTO, VoteResult, VoteStatus
+from app.utils.auth.jwt import get_current_writer
 from app.utils.exceptions import handle_domain_error
+from conf.config import settings
 
 
 @vote_router.put(
-    '', description='Используется для оценки публикации', summary='Update vote', status_code=status.HTTP_200_OK
+    '',
+    description=(
+        'Используется для оценки публикации. '
+        f'При включенной отложенной записи возвращает {status.HTTP_202_ACCEPTED}, оценка сохраняется позже'
+    ),
+    summary='Update vote',
+    status_code=status.HTTP_200_OK,
 )
 @handle_domain_error
 async def create_vote(
     vote: Vote,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> ORJSONResponse:
-    vote = await create_or_update_vote(session, vote.publication_id, current_user.id, vote.value)
+    if settings.VOTE_WRITE_BEHIND_ENABLED:
+        await buffer_vote(current_user.id, vote.publication_id, vote.value)
+        return ORJSONResponse(vote.model_dump(mode='json'), status_code=status.HTTP_202_ACCEPTED)
+
+    db_vote, rating_delta = await create_or_update_vote(session, vote.publication_id, current_user.id, vote.value)
+    await publication_voted(db_vote.publication_id, rating_delta)
+
+    return ORJSONResponse(
+        VoteDTO.model_validate(db_vote, from_attributes=True).model_dump(mode='json'), status_code=status.HTTP_200_OK
+    )
+
+
+@vote_router.put(
+    '/batch',
+    description=(
+        'Оценивает несколько публикаций в одной транзакции, повторные оценки одной публикации перезаписывают '
+        'предыдущие. Возвращает результат для каждой оценки'
+    ),
+    summary='Update votes',
+    status_code=status.HTTP_200_OK,
+)
+@handle_domain_error
+async def create_votes(
+    votes: Annotated[list[Vote], Body(min_length=1, max_length=settings.VOTE_BATCH_SIZE_MAX)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
+    session: AsyncSession = Depends(get_session),
+) -> ORJSONResponse:
+    last_votes = {vote.publication_id: vote.value for vote in votes}
+
+    if settings.VOTE_WRITE_BEHIND_ENABLED:
+        await buffer_votes(current_user.id, last_votes)
+        statuses = dict.fromkeys(last_votes, VoteStatus.ACCEPTED)
+        status_code = status.HTTP_202_ACCEPTED
+    else:
+        rating_deltas, missing_ids = await create_or_update_votes(session, current_user.id, last_votes)
+        await publications_voted(rating_deltas)
+        statuses = {
+            publication_id: (
+                VoteStatus.NOT_FOUND
+                if publication_id in missing_ids
+                else VoteStatus.CHANGED
+                if publication_id in rating_deltas
+                else VoteStatus.UNCHANGED
+            )
+            for publication_id in last_votes
+        }
+        status_code = status.HTTP_200_OK
 
     return ORJSONResponse(
-        VoteDTO.model_validate(vote, from_attributes=True).model_dump(mode='json'), status_code=status.HTTP_200_OK
+        [
+            VoteResult(publication_id=publication_id, value=value, status=statuses[publication_id]).model_dump(
+                mode='json'
+            )
+            for publication_id, value in last_votes.items()
+        ],
+        status_code=status_code,
     )
 
 
@@ -33,10 +94,10 @@ async def create_vote(
 @handle_domain_error
 async def delete_vote_by_publication_id(
     publication_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_writer)],
     session: AsyncSession = Depends(get_session),
 ) -> None:
-    db_vote = await get_vote_by_user_and_publication_id(session, publication_id, current_user.id)
-    if db_vote:
-        await session.delete(db_vote)
-        await session.commit()
+    if settings.VOTE_WRITE_BEHIND_ENABLED:
+        await drop_buffered_vote(current_user.id, publication_id)
+    rating_delta = await delete_vote(session, publication_id, current_user.id)
+    await publication_voted(publication_id, rating_delta)
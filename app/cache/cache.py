@@ -1,32 +1,211 @@
-from typing import Any
+import asyncio
+import secrets
+from time import monotonic
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Sequence
 
 import orjson
+from redis.asyncio.client import Pipeline
 
 from app.cache.key_builder import get_cache_name
+from app.cache.local import local_cache
 from app.db.redis import get_redis
-from app.metrics import async_integrations_timer
+from app.metrics import INTEGRATIONS_BATCH_SIZE, LOCAL_CACHE_REQUESTS, async_integrations_timer
 from conf.config import settings
 
+# Loads currently running in this process, keyed by redis key.
+_inflight_loads: dict[str, asyncio.Task[Any]] = {}
+
+# Deletes a lock only while it holds the token of the worker releasing it.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
 
 @async_integrations_timer
-async def redis_set(model: str, model_id: int, payload: Any) -> None:
+async def redis_set_raw(model: str, model_id: int, cache: bytes) -> None:
     redis = get_redis()
-    redis_key = await get_cache_name(model, model_id)
-    await redis.set(redis_key, orjson.dumps(payload), ex=settings.REDIS_EXPIRE_TIME)
+    redis_key = get_cache_name(model, model_id)
+    await redis.set(redis_key, cache, ex=settings.REDIS_EXPIRE_TIME)
+    if settings.LOCAL_CACHE_ENABLED:
+        local_cache.set(redis_key, cache, len(cache))
+
+
+async def redis_set(model: str, model_id: int, payload: Any) -> None:
+    await redis_set_raw(model, model_id, orjson.dumps(payload))
 
 
 @async_integrations_timer
-async def redis_get(model: str, model_id: int) -> dict[str, str]:
+async def redis_get_raw(model: str, model_id: int) -> bytes | None:
+    """
+    Returns the cached value as stored, encoded JSON.
+    """
+    redis_key = get_cache_name(model, model_id)
+    if settings.LOCAL_CACHE_ENABLED:
+        cache = local_cache.get(redis_key)
+        LOCAL_CACHE_REQUESTS.labels(result='miss' if cache is None else 'hit').inc()
+        if cache is not None:
+            return cache
+
     redis = get_redis()
-    redis_key = await get_cache_name(model, model_id)
     cache = await redis.get(redis_key)
+    if cache is not None and settings.LOCAL_CACHE_ENABLED:
+        local_cache.set(redis_key, cache, len(cache))
+    return cache
+
+
+async def redis_get(model: str, model_id: int) -> dict[str, str]:
+    cache = await redis_get_raw(model, model_id)
     if cache is None:
         return {}
     return orjson.loads(cache)
 
 
+@async_integrations_timer
+async def redis_get_many_raw(model: str, model_ids: Sequence[int]) -> dict[int, bytes]:
+    """
+    Returns cached values of found keys in one round trip, as stored.
+    """
+    redis_keys = {model_id: get_cache_name(model, model_id) for model_id in model_ids}
+    INTEGRATIONS_BATCH_SIZE.labels(integration='redis_get_many').observe(len(redis_keys))
+    caches = {}
+    if settings.LOCAL_CACHE_ENABLED:
+        for model_id, redis_key in redis_keys.items():
+            cache = local_cache.get(redis_key)
+            LOCAL_CACHE_REQUESTS.labels(result='miss' if cache is None else 'hit').inc()
+            if cache is not None:
+                caches[model_id] = cache
+        redis_keys = {model_id: redis_key for model_id, redis_key in redis_keys.items() if model_id not in caches}
+    if not redis_keys:
+        return caches
+
+    redis = get_redis()
+    for (model_id, redis_key), cache in zip(redis_keys.items(), await redis.mget(list(redis_keys.values()))):
+        if cache is None:
+            continue
+        caches[model_id] = cache
+        if settings.LOCAL_CACHE_ENABLED:
+            local_cache.set(redis_key, cache, len(cache))
+
+    return caches
+
+
+async def redis_get_many(model: str, model_ids: Sequence[int]) -> dict[int, Any]:
+    return {model_id: orjson.loads(cache) for model_id, cache in (await redis_get_many_raw(model, model_ids)).items()}
+
+
+@async_integrations_timer
+async def redis_set_many_raw(model: str, caches: Mapping[int, bytes]) -> None:
+    INTEGRATIONS_BATCH_SIZE.labels(integration='redis_set_many').observe(len(caches))
+    if not caches:
+        return
+
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        for model_id, cache in caches.items():
+            redis_key = get_cache_name(model, model_id)
+            pipe.set(redis_key, cache, ex=settings.REDIS_EXPIRE_TIME)
+            if settings.LOCAL_CACHE_ENABLED:
+                local_cache.set(redis_key, cache, len(cache))
+        await pipe.execute()
+
+
+async def redis_set_many(model: str, payloads: Mapping[int, Any]) -> None:
+    await redis_set_many_raw(model, {model_id: orjson.dumps(payload) for model_id, payload in payloads.items()})
+
+
 @async_integrations_timer
 async def redis_drop_key(model: str, model_id: int) -> None:
     redis = get_redis()
-    redis_key = await get_cache_name(model, model_id)
-    await redis.delete(redis_key)
+    redis_key = get_cache_name(model, model_id)
+    if not settings.LOCAL_CACHE_ENABLED:
+        await redis.unlink(redis_key)
+        return
+
+    local_cache.pop(redis_key)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.unlink(redis_key)
+        pipe.publish(settings.LOCAL_CACHE_INVALIDATION_CHANNEL, redis_key)
+        await pipe.execute()
+
+
+@async_integrations_timer
+async def redis_drop_many(model: str, model_ids: Iterable[int]) -> None:
+    model_ids = list(model_ids)
+    INTEGRATIONS_BATCH_SIZE.labels(integration='redis_drop_many').observe(len(model_ids))
+    if not model_ids:
+        return
+
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        queue_drop_many(pipe, model, model_ids)
+        await pipe.execute()
+
+
+def queue_drop_many(pipe: Pipeline, model: str, model_ids: Iterable[int]) -> None:
+    """
+    Queues dropping of cached values on `pipe`, local copies are dropped right away.
+    """
+    redis_keys = [get_cache_name(model, model_id) for model_id in model_ids]
+    if not redis_keys:
+        return
+
+    pipe.unlink(*redis_keys)
+    if settings.LOCAL_CACHE_ENABLED:
+        for redis_key in redis_keys:
+            local_cache.pop(redis_key)
+            pipe.publish(settings.LOCAL_CACHE_INVALIDATION_CHANNEL, redis_key)
+
+
+async def redis_get_or_load(model: str, model_id: int, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Returns the cached encoded value or stores the one encoded by `loader`.
+    Concurrent misses of the same key in one process wait for a single load.
+    """
+    cache = await redis_get_raw(model, model_id)
+    if cache is not None:
+        return cache
+
+    redis_key = get_cache_name(model, model_id)
+    load = _inflight_loads.get(redis_key)
+    if load is None:
+        load = asyncio.ensure_future(_load(model, model_id, redis_key, loader))
+        _inflight_loads[redis_key] = load
+        load.add_done_callback(lambda _: _inflight_loads.pop(redis_key, None))
+
+    return await asyncio.shield(load)
+
+
+async def _load(model: str, model_id: int, redis_key: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+    if not settings.REDIS_LOCK_TIMEOUT_MS:
+        cache = await loader()
+        await redis_set_raw(model, model_id, cache)
+        return cache
+
+    redis = get_redis()
+    lock_key = f'{redis_key}:lock'
+    token = secrets.token_hex(16)
+    if not await redis.set(lock_key, token, nx=True, px=settings.REDIS_LOCK_TIMEOUT_MS):
+        # Another worker is loading this key, wait for it to fill the cache.
+        deadline = monotonic() + settings.REDIS_LOCK_TIMEOUT_MS / 1000
+        while monotonic() < deadline:
+            await asyncio.sleep(settings.REDIS_LOCK_POLL_INTERVAL_MS / 1000)
+            cached = await redis_get_raw(model, model_id)
+            if cached is not None:
+                return cached
+
+        # It took too long, load without the lock and leave it to its owner
+        cache = await loader()
+        await redis_set_raw(model, model_id, cache)
+        return cache
+
+    try:
+        cache = await loader()
+        await redis_set_raw(model, model_id, cache)
+    finally:
+        # The lock may have expired and been taken by another worker meanwhile
+        await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)  # type: ignore[arg-type, misc]
+
+    return cache
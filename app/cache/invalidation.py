@@ -0,0 +1,85 @@
+from typing import Mapping
+
+from app.cache.cache import queue_drop_many, redis_drop_key
+from app.cache.leaderboard import (
+    leaderboard_add,
+    leaderboard_incr,
+    leaderboard_remove,
+    queue_leaderboard_incr_many,
+    queue_leaderboard_set_many,
+)
+from app.cache.ranking import bump_ranking_generation, queue_bump_ranking_generation
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+from app.schema.publication.publication import Publication, PublicationSummaryDTO
+from conf.config import settings
+
+
+async def publication_created(publication_id: int) -> None:
+    if settings.LEADERBOARD_ENABLED:
+        await leaderboard_add(publication_id)
+    if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        await bump_ranking_generation()
+
+
+async def publication_updated(publication_id: int) -> None:
+    if settings.LEADERBOARD_ENABLED:
+        await leaderboard_add(publication_id)
+    await redis_drop_key(Publication.__name__, publication_id)
+    await redis_drop_key(PublicationSummaryDTO.__name__, publication_id)
+    if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        await bump_ranking_generation()
+
+
+async def publication_deleted(publication_id: int) -> None:
+    if settings.LEADERBOARD_ENABLED:
+        await leaderboard_remove(publication_id)
+    await redis_drop_key(Publication.__name__, publication_id)
+    await redis_drop_key(PublicationSummaryDTO.__name__, publication_id)
+    if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        await bump_ranking_generation()
+
+
+async def publication_voted(publication_id: int, rating_delta: int) -> None:
+    if not rating_delta:
+        return
+
+    if settings.LEADERBOARD_ENABLED:
+        await leaderboard_incr(publication_id, rating_delta)
+    await redis_drop_key(Publication.__name__, publication_id)
+    if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        await bump_ranking_generation()
+
+
+@async_integrations_timer
+async def publications_voted(rating_deltas: Mapping[int, int]) -> None:
+    rating_deltas = {publication_id: delta for publication_id, delta in rating_deltas.items() if delta}
+    if not rating_deltas:
+        return
+
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        if settings.LEADERBOARD_ENABLED:
+            queue_leaderboard_incr_many(pipe, rating_deltas)
+        queue_drop_many(pipe, Publication.__name__, rating_deltas)
+        if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+            queue_bump_ranking_generation(pipe)
+        await pipe.execute()
+
+
+@async_integrations_timer
+async def publications_rescored(ratings: Mapping[int, int]) -> None:
+    """
+    Replaces cached ratings with the ones read from Postgres, when applied deltas may have been lost.
+    """
+    if not ratings:
+        return
+
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        if settings.LEADERBOARD_ENABLED:
+            queue_leaderboard_set_many(pipe, ratings)
+        queue_drop_many(pipe, Publication.__name__, ratings)
+        if settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+            queue_bump_ranking_generation(pipe)
+        await pipe.execute()
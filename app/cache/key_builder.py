@@ -1,5 +1,29 @@
 from conf.config import settings
 
 
-async def get_cache_name(model: str, model_id: int) -> str:
+def get_cache_name(model: str, model_id: int) -> str:
     return f'{settings.REDIS_CACHE_PREFIX}:{model}:{model_id}'
+
+
+def get_leaderboard_name() -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:leaderboard'
+
+
+def get_ranking_generation_name() -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:ranking_generation'
+
+
+def get_page_cache_name(model: str, generation: int, page: str) -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:{model}:{generation}:{page}'
+
+
+def get_revoked_users_name() -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:revoked_users'
+
+
+def get_vote_buffer_name() -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:vote_buffer'
+
+
+def get_primary_pin_name(user_id: int) -> str:
+    return f'{settings.REDIS_CACHE_PREFIX}:primary_pin:{user_id}'
@@ -0,0 +1,122 @@
+from typing import AsyncIterator, Mapping, Sequence
+
+from redis.asyncio.client import Pipeline
+
+from app.cache.key_builder import get_leaderboard_name
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+from conf.config import settings
+
+# Members are zero-padded so that ties on score are ordered like `id DESC` in Postgres.
+MEMBER_WIDTH = 10
+
+
+def _member(publication_id: int) -> str:
+    return str(publication_id).zfill(MEMBER_WIDTH)
+
+
+def _built_marker() -> str:
+    return f'{get_leaderboard_name()}:built'
+
+
+@async_integrations_timer
+async def leaderboard_add(publication_id: int) -> None:
+    redis = get_redis()
+    await redis.zadd(get_leaderboard_name(), {_member(publication_id): 0}, nx=True)
+
+
+@async_integrations_timer
+async def leaderboard_incr(publication_id: int, delta: int) -> None:
+    if not delta:
+        return
+    redis = get_redis()
+    await redis.zincrby(get_leaderboard_name(), delta, _member(publication_id))
+
+
+def queue_leaderboard_incr_many(pipe: Pipeline, deltas: Mapping[int, int]) -> None:
+    for publication_id, delta in deltas.items():
+        if delta:
+            pipe.zincrby(get_leaderboard_name(), delta, _member(publication_id))
+
+
+def queue_leaderboard_set_many(pipe: Pipeline, ratings: Mapping[int, int]) -> None:
+    if ratings:
+        pipe.zadd(
+            get_leaderboard_name(), {_member(publication_id): rating for publication_id, rating in ratings.items()}
+        )
+
+
+@async_integrations_timer
+async def leaderboard_remove(publication_id: int) -> None:
+    redis = get_redis()
+    await redis.zrem(get_leaderboard_name(), _member(publication_id))
+
+
+@async_integrations_timer
+async def leaderboard_top(skip: int, limit: int) -> list[tuple[int, int]] | None:
+    """
+    Returns `(publication_id, rating)` pairs ordered by rating,
+    or `None` if the leaderboard has not been built yet.
+    """
+    redis = get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.exists(_built_marker())
+        pipe.zrevrange(get_leaderboard_name(), skip, skip + limit - 1, withscores=True)
+        built, members = await pipe.execute()
+
+    if not built:
+        return None
+    return [(int(member), int(score)) for member, score in members]
+
+
+@async_integrations_timer
+async def leaderboard_is_built() -> bool:
+    redis = get_redis()
+    return bool(await redis.exists(_built_marker()))
+
+
+@async_integrations_timer
+async def leaderboard_invalidate() -> None:
+    """
+    Marks the leaderboard as not built, reads fall back to Postgres until it is rebuilt.
+    """
+    redis = get_redis()
+    await redis.delete(_built_marker())
+
+
+@async_integrations_timer
+async def acquire_rebuild_lock() -> bool:
+    redis = get_redis()
+    return bool(
+        await redis.set(
+            f'{get_leaderboard_name()}:rebuild_lock', 1, nx=True, px=settings.LEADERBOARD_REBUILD_LOCK_TIMEOUT_MS
+        )
+    )
+
+
+@async_integrations_timer
+async def release_rebuild_lock() -> None:
+    redis = get_redis()
+    await redis.delete(f'{get_leaderboard_name()}:rebuild_lock')
+
+
+@async_integrations_timer
+async def rebuild_leaderboard(ratings: AsyncIterator[Sequence[tuple[int, int]]]) -> int:
+    redis = get_redis()
+    leaderboard_name = get_leaderboard_name()
+    rebuild_name = f'{leaderboard_name}:rebuild'
+
+    await redis.delete(rebuild_name)
+    count = 0
+    async for batch in ratings:
+        if batch:
+            await redis.zadd(rebuild_name, {_member(publication_id): rating for publication_id, rating in batch})
+            count += len(batch)
+
+    if count:
+        await redis.rename(rebuild_name, leaderboard_name)
+    else:
+        await redis.delete(leaderboard_name)
+    await redis.set(_built_marker(), 1)
+
+    return count
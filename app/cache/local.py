@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any
+
+from conf.config import settings
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with TTL.
+    Size of an entry is the length of its serialized value.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, expire_time: float) -> None:
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.expire_time = expire_time
+        self.size = 0
+        self._items: OrderedDict[str, tuple[float, int, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: str) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        expires_at, _, value = item
+        if expires_at < monotonic():
+            self.pop(key)
+            return None
+
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        self.pop(key)
+        if size > self.max_bytes:
+            return
+
+        self._items[key] = (monotonic() + self.expire_time, size, value)
+        self.size += size
+        while len(self._items) > self.max_items or self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self._items.popitem(last=False)
+            self.size -= evicted_size
+
+    def pop(self, key: str) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= item[1]
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.size = 0
+
+
+local_cache = LocalCache(
+    max_items=settings.LOCAL_CACHE_MAX_ITEMS,
+    max_bytes=settings.LOCAL_CACHE_MAX_BYTES,
+    expire_time=settings.LOCAL_CACHE_EXPIRE_TIME,
+)
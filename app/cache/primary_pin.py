@@ -0,0 +1,16 @@
+from app.cache.key_builder import get_primary_pin_name
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+from conf.config import settings
+
+
+@async_integrations_timer
+async def pin_user_to_primary(user_id: int) -> None:
+    redis = get_redis()
+    await redis.set(get_primary_pin_name(user_id), 1, ex=settings.DB_READ_YOUR_WRITES_TIME)
+
+
+@async_integrations_timer
+async def is_user_pinned_to_primary(user_id: int) -> bool:
+    redis = get_redis()
+    return bool(await redis.exists(get_primary_pin_name(user_id)))
@@ -0,0 +1,44 @@
+from typing import Any
+
+import orjson
+from redis.asyncio.client import Pipeline
+
+from app.cache.key_builder import get_page_cache_name, get_ranking_generation_name
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+from conf.config import settings
+
+
+@async_integrations_timer
+async def get_ranking_generation() -> int:
+    redis = get_redis()
+    return int(await redis.get(get_ranking_generation_name()) or 0)
+
+
+@async_integrations_timer
+async def bump_ranking_generation() -> None:
+    redis = get_redis()
+    await redis.incr(get_ranking_generation_name())
+
+
+def queue_bump_ranking_generation(pipe: Pipeline) -> None:
+    pipe.incr(get_ranking_generation_name())
+
+
+@async_integrations_timer
+async def redis_get_page(model: str, generation: int, page: str) -> Any | None:
+    redis = get_redis()
+    cache = await redis.get(get_page_cache_name(model, generation, page))
+    if cache is None:
+        return None
+    return orjson.loads(cache)
+
+
+@async_integrations_timer
+async def redis_set_page(model: str, generation: int, page: str, payload: Any) -> None:
+    redis = get_redis()
+    await redis.set(
+        get_page_cache_name(model, generation, page),
+        orjson.dumps(payload),
+        ex=settings.PUBLICATIONS_PAGE_EXPIRE_TIME,
+    )
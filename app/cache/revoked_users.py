@@ -0,0 +1,21 @@
+from app.cache.key_builder import get_revoked_users_name
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+
+
+@async_integrations_timer
+async def revoke_user(user_id: int) -> None:
+    redis = get_redis()
+    await redis.sadd(get_revoked_users_name(), str(user_id))  # type: ignore[misc]
+
+
+@async_integrations_timer
+async def restore_user(user_id: int) -> None:
+    redis = get_redis()
+    await redis.srem(get_revoked_users_name(), str(user_id))  # type: ignore[misc]
+
+
+@async_integrations_timer
+async def is_user_revoked(user_id: int) -> bool:
+    redis = get_redis()
+    return bool(await redis.sismember(get_revoked_users_name(), str(user_id)))  # type: ignore[misc]
@@ -0,0 +1,121 @@
+from typing import Mapping, Sequence
+
+from redis.exceptions import ResponseError
+
+from app.cache.key_builder import get_vote_buffer_name
+from app.db.redis import get_redis
+from app.metrics import async_integrations_timer
+from conf.config import settings
+
+
+def _processing_name() -> str:
+    return f'{get_vote_buffer_name()}:processing'
+
+
+def _lock_name() -> str:
+    return f'{get_vote_buffer_name()}:lock'
+
+
+def _tombstones_name() -> str:
+    return f'{get_vote_buffer_name()}:deleted'
+
+
+def _field(user_id: int, publication_id: int) -> str:
+    return f'{user_id}:{publication_id}'
+
+
+@async_integrations_timer
+async def buffer_vote(user_id: int, publication_id: int, value: int) -> None:
+    redis = get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(get_vote_buffer_name(), _field(user_id, publication_id), str(value))
+        # A new vote supersedes an earlier deletion
+        pipe.hdel(_tombstones_name(), _field(user_id, publication_id))  # type: ignore[arg-type]
+        await pipe.execute()
+
+
+@async_integrations_timer
+async def buffer_votes(user_id: int, votes: Mapping[int, int]) -> None:
+    redis = get_redis()
+    fields = {_field(user_id, publication_id): str(value) for publication_id, value in votes.items()}
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(get_vote_buffer_name(), mapping=fields)
+        pipe.hdel(_tombstones_name(), *fields)  # type: ignore[arg-type]
+        await pipe.execute()
+
+
+@async_integrations_timer
+async def drop_buffered_vote(user_id: int, publication_id: int) -> None:
+    """
+    Drops a buffered vote and leaves a tombstone,
+    so a flush that has already taken the vote deletes it again once it is written.
+    """
+    redis = get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(_tombstones_name(), _field(user_id, publication_id), '1')
+        pipe.hdel(get_vote_buffer_name(), _field(user_id, publication_id))  # type: ignore[arg-type]
+        pipe.hdel(_processing_name(), _field(user_id, publication_id))  # type: ignore[arg-type]
+        await pipe.execute()
+
+
+def _parse_field(field: bytes) -> tuple[int, int]:
+    user_id, publication_id = field.split(b':')
+    return int(user_id), int(publication_id)
+
+
+@async_integrations_timer
+async def take_buffered_votes() -> tuple[list[dict[str, int]], bool]:
+    """
+    Moves buffered votes aside for flushing and returns them.
+    Votes left by an interrupted flush are returned again before new ones,
+    the flag tells that the returned votes are such a replay.
+    """
+    redis = get_redis()
+    try:
+        replayed = not await redis.renamenx(get_vote_buffer_name(), _processing_name())
+    except ResponseError:
+        # Nothing new was buffered, anything being processed is left over
+        replayed = True
+
+    votes = await redis.hgetall(_processing_name())  # type: ignore[misc]
+    buffered_votes = []
+    for field, value in votes.items():
+        user_id, publication_id = _parse_field(field)
+        buffered_votes.append({'user_id': user_id, 'publication_id': publication_id, 'value': int(value)})
+    return buffered_votes, replayed and bool(buffered_votes)
+
+
+@async_integrations_timer
+async def get_vote_tombstones() -> list[tuple[int, int]]:
+    """
+    Returns `(user_id, publication_id)` pairs of votes deleted since they were buffered.
+    """
+    redis = get_redis()
+    return [_parse_field(field) for field in await redis.hkeys(_tombstones_name())]  # type: ignore[misc]
+
+
+@async_integrations_timer
+async def ack_vote_tombstones(tombstones: Sequence[tuple[int, int]]) -> None:
+    if not tombstones:
+        return
+    redis = get_redis()
+    fields = [_field(user_id, publication_id) for user_id, publication_id in tombstones]
+    await redis.hdel(_tombstones_name(), *fields)  # type: ignore[arg-type, misc]
+
+
+@async_integrations_timer
+async def ack_buffered_votes() -> None:
+    redis = get_redis()
+    await redis.delete(_processing_name())
+
+
+@async_integrations_timer
+async def acquire_flush_lock() -> bool:
+    redis = get_redis()
+    return bool(await redis.set(_lock_name(), 1, nx=True, px=settings.VOTE_WRITE_BEHIND_LOCK_TIMEOUT_MS))
+
+
+@async_integrations_timer
+async def release_flush_lock() -> None:
+    redis = get_redis()
+    await redis.delete(_lock_name())
@@ -0,0 +1,22 @@
+from enum import Enum
+from typing import Sequence
+
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.models.publication.publication import Publication
+
+
+class LoadProfile(str, Enum):
+    # Only the row itself, relationships raise on access
+    SUMMARY = 'summary'
+    # Publication with all of its votes
+    DETAIL = 'detail'
+    # User with a page of their publications
+    AUTHOR = 'author'
+
+
+PUBLICATION_LOAD_OPTIONS: dict[LoadProfile, Sequence[ORMOption]] = {
+    LoadProfile.SUMMARY: (),
+    LoadProfile.DETAIL: (selectinload(Publication.votes),),
+}
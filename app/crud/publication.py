@@ -1,16 +1,20 @@
-from typing import Sequence
+from typing import AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.crud.profiles import PUBLICATION_LOAD_OPTIONS, LoadProfile
 from app.models.publication.publication import Publication
 from app.models.publication.vote import Vote
 from app.utils.exceptions import PublicationForbiddenError, PublicationNotFoundError
 
 
-async def get_publication_by_id(session: AsyncSession, publication_id: int) -> Publication:
-    db_publication = await session.get(Publication, publication_id)
+async def get_publication_by_id(
+    session: AsyncSession, publication_id: int, profile: LoadProfile = LoadProfile.SUMMARY
+) -> Publication:
+    db_publication = await session.get(
+        Publication, publication_id, options=PUBLICATION_LOAD_OPTIONS[profile], populate_existing=True
+    )
     if not db_publication:
         raise PublicationNotFoundError(publication_id)
 
@@ -25,18 +29,37 @@ async def create_new_publication(session: AsyncSession, text: str, author_id: in
     return db_publication
 
 
-async def get_publications(session: AsyncSession, skip: int, limit: int) -> Sequence[Publication]:
-    res = await session.scalars(
-        select(Publication, Publication.votes)
-        .join(Vote, isouter=True)
-        .order_by(func.sum(Vote.value).desc().nullslast())
-        .group_by(Publication, Vote.publication_id)
-        .options(selectinload(Publication.votes))
-        .offset(skip)
-        .limit(limit)
+async def stream_publication_ratings(
+    session: AsyncSession, batch_size: int
+) -> AsyncIterator[Sequence[tuple[int, int]]]:
+    res = await session.stream(
+        select(Publication.id, Publication.rating).execution_options(yield_per=batch_size),
     )
+    async for partition in res.partitions():
+        yield [(publication_id, rating) for publication_id, rating in partition]
 
-    return res.all()
+
+async def get_publication_ratings(session: AsyncSession, publication_ids: Iterable[int]) -> dict[int, int]:
+    res = await session.execute(
+        select(Publication.id, Publication.rating).where(Publication.id.in_(publication_ids)),
+    )
+
+    return dict(res.tuples().all())
+
+
+async def update_publication_rating(session: AsyncSession, publication_id: int, old_value: int, new_value: int) -> bool:
+    res = await session.execute(
+        update(Publication)
+        .where(Publication.id == publication_id)
+        .values(
+            rating=Publication.rating + new_value - old_value,
+            likes=Publication.likes + int(new_value == 1) - int(old_value == 1),
+            dislikes=Publication.dislikes + int(new_value == -1) - int(old_value == -1),
+        )
+        .returning(Publication.id)
+    )
+
+    return res.scalar_one_or_none() is not None
 
 
 async def update_or_create_publication(
@@ -55,3 +78,28 @@ async def update_or_create_publication(
     session.add(publication)
     await session.commit()
     return publication
+
+
+async def get_author_publications(
+    session: AsyncSession, author_id: int, skip: int, limit: int
+) -> Sequence[Publication]:
+    res = await session.scalars(
+        select(Publication)
+        .where(Publication.author_id == author_id)
+        .order_by(Publication.id.desc())
+        .options(*PUBLICATION_LOAD_OPTIONS[LoadProfile.SUMMARY])
+        .offset(skip)
+        .limit(limit)
+    )
+
+    return res.all()
+
+
+async def delete_publication_by_id(session: AsyncSession, publication_id: int, author_id: int) -> None:
+    publication = await get_publication_by_id(session, publication_id)
+    if publication.author_id != author_id:
+        raise PublicationForbiddenError()
+
+    await session.execute(delete(Vote).where(Vote.publication_id == publication_id))
+    await session.execute(delete(Publication).where(Publication.id == publication_id))
+    await session.commit()
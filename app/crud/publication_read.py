@@ -0,0 +1,85 @@
+from typing import Any, Sequence
+
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.publication.publication import Publication
+from app.models.publication.vote import Vote
+from app.utils.exceptions import PublicationNotFoundError
+
+# Read-only queries of the hottest routes run through Core, rows are not hydrated into identity-mapped ORM objects.
+publication_table = Publication.__table__
+vote_table = Vote.__table__
+
+SUMMARY_COLUMNS = (
+    publication_table.c.id,
+    publication_table.c.text,
+    publication_table.c.author_id,
+    publication_table.c.publication_date,
+    publication_table.c.rating,
+)
+DETAIL_COLUMNS = (*SUMMARY_COLUMNS, publication_table.c.likes, publication_table.c.dislikes)
+
+
+class PublicationDetail:
+    """
+    Publication row with its votes, attributes match the publication model.
+    """
+
+    __slots__ = ('id', 'text', 'author_id', 'publication_date', 'rating', 'likes', 'dislikes', 'votes')
+
+    def __init__(self, row: Row[Any], votes: list[Row[Any]]) -> None:
+        self.id, self.text, self.author_id, self.publication_date, self.rating, self.likes, self.dislikes = row
+        self.votes = votes
+
+
+async def read_publications(
+    session: AsyncSession, skip: int, limit: int, after: tuple[int, int] | None = None
+) -> Sequence[Row[Any]]:
+    query = (
+        select(*SUMMARY_COLUMNS).order_by(publication_table.c.rating.desc(), publication_table.c.id.desc()).limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(publication_table.c.rating, publication_table.c.id) < after)
+    else:
+        query = query.offset(skip)
+
+    connection = await session.connection()
+    return (await connection.execute(query)).all()
+
+
+async def read_publications_by_ids(session: AsyncSession, publication_ids: Sequence[int]) -> Sequence[Row[Any]]:
+    connection = await session.connection()
+    res = await connection.execute(select(*SUMMARY_COLUMNS).where(publication_table.c.id.in_(publication_ids)))
+
+    return res.all()
+
+
+async def read_publication_details_by_ids(
+    session: AsyncSession, publication_ids: Sequence[int]
+) -> list[PublicationDetail]:
+    connection = await session.connection()
+    publications = (
+        await connection.execute(select(*DETAIL_COLUMNS).where(publication_table.c.id.in_(publication_ids)))
+    ).all()
+    if not publications:
+        return []
+
+    votes: dict[int, list[Row[Any]]] = {publication.id: [] for publication in publications}
+    res = await connection.execute(
+        select(vote_table.c.value, vote_table.c.publication_id)
+        .where(vote_table.c.publication_id.in_(votes))
+        .order_by(vote_table.c.id)
+    )
+    for vote in res:
+        votes[vote.publication_id].append(vote)
+
+    return [PublicationDetail(publication, votes[publication.id]) for publication in publications]
+
+
+async def read_publication_detail(session: AsyncSession, publication_id: int) -> PublicationDetail:
+    publications = await read_publication_details_by_ids(session, [publication_id])
+    if not publications:
+        raise PublicationNotFoundError(publication_id)
+
+    return publications[0]
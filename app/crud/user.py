@@ -3,13 +3,26 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.crud.profiles import LoadProfile
+from app.crud.publication import get_author_publications
 from app.models.publication.user import User
 from app.utils.exceptions import UserExistError
 
 
-async def get_user_by_id(session: AsyncSession, user_id: int) -> User | None:
-    return await session.get(User, user_id)
+async def get_user_by_id(
+    session: AsyncSession,
+    user_id: int,
+    profile: LoadProfile = LoadProfile.SUMMARY,
+    skip: int = 0,
+    limit: int = 10,
+) -> User | None:
+    db_user = await session.get(User, user_id)
+    if db_user and profile == LoadProfile.AUTHOR:
+        set_committed_value(db_user, 'publications', await get_author_publications(session, user_id, skip, limit))
+
+    return db_user
 
 
 async def get_user_by_username(session: AsyncSession, username: str) -> User | None:
@@ -26,3 +39,8 @@ async def create_user(session: AsyncSession, user: dict[str, Any]) -> User:
         raise UserExistError()
 
     return db_user
+
+
+async def update_user_password(session: AsyncSession, user: User, password: str) -> None:
+    user.password = password
+    await session.commit()
@@ -1,28 +1,219 @@
-from sqlalchemy import select
+from typing import Any, Mapping, Sequence
+
+from asyncpg.exceptions import ForeignKeyViolationError
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    Row,
+    Select,
+    and_,
+    case,
+    column,
+    delete,
+    exists,
+    func,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.publication import get_publication_by_id
+from app.crud.publication import update_publication_rating
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
 from app.models.publication.vote import Vote
-from app.utils.exceptions import PublicationNotFoundError
+from app.utils.exceptions import PrincipalNotFoundError, PublicationNotFoundError
 
+# Default Postgres names of the vote foreign keys
+USER_FOREIGN_KEY = f'{Vote.__tablename__}_user_id_fkey'
+PUBLICATION_FOREIGN_KEY = f'{Vote.__tablename__}_publication_id_fkey'
 
-async def create_or_update_vote(session: AsyncSession, publication_id: int, user_id: int, value: int) -> Vote:
-    res = await session.scalars(
-        select(Vote).where(Vote.publication_id == publication_id).where(Vote.user_id == user_id),
+
+def upsert_votes_statement(votes: Sequence[dict[str, Any]], skip_missing_references: bool = False) -> Select[Any]:
+    """
+    Upserts votes and applies rating changes to their publications in a single statement.
+    Returns only the votes that were created or changed.
+    With `skip_missing_references` votes of unknown users or for unknown publications are ignored
+    instead of failing the statement, and every written vote is returned, `inserted` is null for unchanged ones.
+    """
+    valid_votes = None
+    if skip_missing_references:
+        new_votes = values(
+            column('user_id', Integer), column('publication_id', Integer), column('value', Integer), name='new_votes'
+        ).data([(vote['user_id'], vote['publication_id'], vote['value']) for vote in votes])
+        # Publications are locked in id order, concurrent batches updating the same ratings cannot deadlock
+        valid_votes = (
+            select(new_votes)
+            .join(Publication, Publication.id == new_votes.c.publication_id)
+            .join(User, User.id == new_votes.c.user_id)
+            .order_by(new_votes.c.publication_id)
+            .with_for_update(of=Publication, key_share=True)
+            .cte('valid_votes')
+        )
+        insert_votes = insert(Vote).from_select(['user_id', 'publication_id', 'value'], select(valid_votes))
+    else:
+        insert_votes = insert(Vote).values(votes)
+    upsert = (
+        insert_votes.on_conflict_do_update(
+            index_elements=[Vote.user_id, Vote.publication_id],
+            set_={'value': insert_votes.excluded.value},
+            where=Vote.value != insert_votes.excluded.value,
+        )
+        .returning(
+            Vote.id,
+            Vote.user_id,
+            Vote.publication_id,
+            Vote.value,
+            literal_column('xmax = 0', Boolean).label('inserted'),
+        )
+        .cte('upsert')
+    )
+    # Vote values are 1 or -1, so an updated vote always flips its sign.
+    deltas = (
+        select(
+            upsert.c.publication_id,
+            func.sum(case((upsert.c.inserted, upsert.c.value), else_=2 * upsert.c.value)).label('rating'),
+            func.sum(case((upsert.c.value == 1, 1), (upsert.c.inserted, 0), else_=-1)).label('likes'),
+            func.sum(case((upsert.c.value == -1, 1), (upsert.c.inserted, 0), else_=-1)).label('dislikes'),
+        )
+        .group_by(upsert.c.publication_id)
+        .cte('deltas')
+    )
+    rating_update = (
+        update(Publication)
+        .where(Publication.id == deltas.c.publication_id)
+        .values(
+            rating=Publication.rating + deltas.c.rating,
+            likes=Publication.likes + deltas.c.likes,
+            dislikes=Publication.dislikes + deltas.c.dislikes,
+        )
+        .returning(Publication.id)
+        .cte('rating_update')
+    )
+
+    if valid_votes is None:
+        return select(
+            upsert.c.id, upsert.c.user_id, upsert.c.publication_id, upsert.c.value, upsert.c.inserted
+        ).add_cte(rating_update)
+
+    return (
+        select(upsert.c.id, valid_votes.c.user_id, valid_votes.c.publication_id, valid_votes.c.value, upsert.c.inserted)
+        .outerjoin(
+            upsert,
+            and_(upsert.c.user_id == valid_votes.c.user_id, upsert.c.publication_id == valid_votes.c.publication_id),
+        )
+        .add_cte(rating_update)
     )
-    db_vote = res.one_or_none()
-    if not db_vote:
-        db_publication = await get_publication_by_id(session, publication_id)
-        if not db_publication:
+
+
+def vote_rating_delta(value: int, inserted: bool | None) -> int:
+    if inserted is None:
+        # The vote already had this value
+        return 0
+    return value if inserted else 2 * value
+
+
+async def upsert_votes(session: AsyncSession, votes: Sequence[dict[str, Any]]) -> Sequence[Row[Any]]:
+    """
+    Upserts many votes at once and returns the written ones,
+    votes of unknown users or for unknown publications are skipped.
+    Every (user_id, publication_id) pair must occur only once.
+    """
+    if not votes:
+        return []
+
+    res = await session.execute(upsert_votes_statement(votes, skip_missing_references=True))
+    written_votes = res.all()
+    await session.commit()
+
+    return written_votes
+
+
+def _violated_foreign_key(error: IntegrityError) -> str | None:
+    cause = error.orig.__cause__ if error.orig is not None else None
+    if isinstance(cause, ForeignKeyViolationError):
+        return cause.constraint_name
+    return None
+
+
+async def create_or_update_vote(
+    session: AsyncSession, publication_id: int, user_id: int, value: int
+) -> tuple[Vote, int]:
+    try:
+        res = await session.execute(
+            upsert_votes_statement([{'publication_id': publication_id, 'user_id': user_id, 'value': value}]),
+        )
+    except IntegrityError as error:
+        await session.rollback()
+        foreign_key = _violated_foreign_key(error)
+        if foreign_key == PUBLICATION_FOREIGN_KEY:
             raise PublicationNotFoundError(id=publication_id)
+        if foreign_key == USER_FOREIGN_KEY:
+            # The principal comes from the token, its user may have been deleted since
+            raise PrincipalNotFoundError()
+        raise
+
+    changed_vote = res.one_or_none()
+    await session.commit()
+
+    if changed_vote is None:
+        # The vote already has this value
+        db_votes = await session.scalars(
+            select(Vote).where(Vote.publication_id == publication_id).where(Vote.user_id == user_id),
+        )
+        return db_votes.one(), 0
+
+    db_vote = Vote(
+        id=changed_vote.id,
+        user_id=changed_vote.user_id,
+        publication_id=changed_vote.publication_id,
+        value=changed_vote.value,
+    )
+    return db_vote, vote_rating_delta(value, changed_vote.inserted)
 
-        db_vote = Vote(publication_id=publication_id, user_id=user_id, value=value)
 
-    db_vote.value = value
-    session.add(db_vote)
+async def create_or_update_votes(
+    session: AsyncSession, user_id: int, votes: Mapping[int, int]
+) -> tuple[dict[int, int], set[int]]:
+    """
+    Sets many votes of one user in a single transaction, `votes` maps publication ids to values.
+    Returns rating deltas of changed publications and ids of missing publications.
+    """
+    written_votes = await upsert_votes(
+        session,
+        [
+            {'user_id': user_id, 'publication_id': publication_id, 'value': value}
+            for publication_id, value in votes.items()
+        ],
+    )
+
+    if not written_votes and not await session.scalar(select(exists().where(User.id == user_id))):
+        # The principal comes from the token, its user may have been deleted since
+        raise PrincipalNotFoundError()
+
+    rating_deltas = {
+        vote.publication_id: vote_rating_delta(vote.value, vote.inserted)
+        for vote in written_votes
+        if vote.inserted is not None
+    }
+    return rating_deltas, set(votes) - {vote.publication_id for vote in written_votes}
+
+
+async def delete_vote(session: AsyncSession, publication_id: int, user_id: int) -> int:
+    res = await session.execute(
+        delete(Vote).where(Vote.publication_id == publication_id).where(Vote.user_id == user_id).returning(Vote.value),
+    )
+    old_value = res.scalar_one_or_none()
+    if old_value is None:
+        return 0
+
+    await update_publication_rating(session, publication_id, old_value, 0)
     await session.commit()
 
-    return db_vote
+    return -old_value
 
 
 async def get_vote_by_user_and_publication_id(session: AsyncSession, publication_id: int, user_id: int) -> Vote | None:
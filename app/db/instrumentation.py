@@ -0,0 +1,60 @@
+import re
+from functools import lru_cache
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.metrics import SQL_LATENCY, SQL_ROWS, request_query_counter
+
+STATEMENT_LABEL_MAX_LENGTH = 300
+
+_PLACEHOLDER = re.compile(r'\$\d+(?:::\w+)?')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+\b')
+_LIST = re.compile(r'\(\?(?:\s*,\s*\?)*\)')
+_LISTS = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=1024)
+def statement_fingerprint(statement: str) -> str:
+    """
+    Replaces parameters and literals with `?` and collapses lists of them,
+    so statements differing only in values or `IN` list length share a fingerprint.
+    """
+    fingerprint = _PLACEHOLDER.sub('?', statement)
+    fingerprint = _STRING.sub('?', fingerprint)
+    fingerprint = _NUMBER.sub('?', fingerprint)
+    fingerprint = _LIST.sub('(?)', fingerprint)
+    fingerprint = _LISTS.sub('(?)', fingerprint)
+    return _SPACE.sub(' ', fingerprint).strip()[:STATEMENT_LABEL_MAX_LENGTH]
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    conn.info.setdefault('query_start_time', []).append(monotonic())
+
+
+def _after_cursor_execute(conn: Connection, cursor: Any, statement: str, *args: Any) -> None:
+    process_time = monotonic() - conn.info['query_start_time'].pop()
+    fingerprint = statement_fingerprint(statement)
+    SQL_LATENCY.labels(statement=fingerprint).observe(process_time)
+    if cursor.rowcount >= 0:
+        SQL_ROWS.labels(statement=fingerprint).observe(cursor.rowcount)
+
+    query_counter = request_query_counter.get()
+    if query_counter is not None:
+        query_counter.count += 1
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    if context.connection is not None and context.connection.info.get('query_start_time'):
+        context.connection.info['query_start_time'].pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine.sync_engine, 'handle_error', _handle_error)
@@ -1,19 +1,63 @@
-from typing import AsyncGenerator
+from time import monotonic
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import QueuePool
+from sqlalchemy import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import ConnectionPoolEntry
 
+from app.db.instrumentation import instrument_engine
+from app.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_WAIT, DB_POOL_OVERFLOW
 from conf.config import settings
 
 
-def create_engine(db_url: str = settings.DB_URL) -> AsyncEngine:
-    return create_async_engine(
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Reports checked out connections, overflow and checkout wait time, labeled with the pool logging name.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start_time = monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(pool=self._metrics_name()).observe(monotonic() - start_time)
+            self._report_usage()
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        self._report_usage()
+
+    def _metrics_name(self) -> str:
+        return self.logging_name or 'primary'
+
+    def _report_usage(self) -> None:
+        DB_POOL_CHECKED_OUT.labels(pool=self._metrics_name()).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(pool=self._metrics_name()).set(max(self.overflow(), 0))
+
+
+def create_engine(db_url: str = settings.DB_URL, name: str = 'primary') -> AsyncEngine:
+    connect_args: dict[str, Any] = {}
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        # Prepared statements do not survive switching server connections between transactions
+        connect_args['statement_cache_size'] = 0
+    else:
+        connect_args['statement_cache_size'] = settings.DB_STATEMENT_CACHE_SIZE
+
+    engine = create_async_engine(
         db_url,
-        poolclass=QueuePool,
-        connect_args={
-            'statement_cache_size': 0,
-        },
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_logging_name=name,
+        connect_args=connect_args,
     )
+    if settings.SQL_METRICS_ENABLED:
+        instrument_engine(engine)
+
+    return engine
 
 
 def create_session(
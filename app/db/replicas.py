@@ -0,0 +1,106 @@
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import Annotated, AsyncContextManager, AsyncGenerator, AsyncIterator, Callable, cast
+
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.cache.primary_pin import is_user_pinned_to_primary
+from app.db.postgres import InstrumentedPool, async_session, create_engine, create_session, get_session
+from app.utils.auth.jwt import get_token_user_id, optional_oauth2_scheme
+from conf.config import settings
+
+
+class ReplicaSet:
+    """
+    Chooses a replica for a read, replicas failing to connect are skipped for `eject_time` seconds.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], selection: str, eject_time: float) -> None:
+        self.engines = engines
+        self.selection = selection
+        self.eject_time = eject_time
+        self._ejected_until: dict[AsyncEngine, float] = {}
+        self._turn = 0
+
+    def choose(self) -> AsyncEngine | None:
+        now = monotonic()
+        healthy_engines = [engine for engine in self.engines if self._ejected_until.get(engine, 0) <= now]
+        if not healthy_engines:
+            return None
+
+        if self.selection == 'least_connections':
+            return min(healthy_engines, key=lambda engine: cast(InstrumentedPool, engine.pool).checkedout())
+
+        self._turn += 1
+        return healthy_engines[self._turn % len(healthy_engines)]
+
+    def eject(self, engine: AsyncEngine) -> None:
+        logger.warning('Replica {url} ejected', url=engine.url.render_as_string())
+        self._ejected_until[engine] = monotonic() + self.eject_time
+
+
+def is_connection_error(error: Exception) -> bool:
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error, (InterfaceError, OperationalError))
+    return isinstance(error, (OSError, TimeoutError))
+
+
+replica_set = ReplicaSet(
+    [create_engine(url, name=f'replica{number}') for number, url in enumerate(settings.DB_REPLICA_URLS)],
+    selection=settings.DB_REPLICA_SELECTION,
+    eject_time=settings.DB_REPLICA_EJECT_TIME,
+)
+replica_sessions: dict[AsyncEngine, async_sessionmaker[AsyncSession]] = {
+    engine: create_session(engine) for engine in replica_set.engines
+}
+
+
+async def get_read_session(
+    primary_session: Annotated[AsyncSession, Depends(get_session)],
+    token: Annotated[str | None, Depends(optional_oauth2_scheme)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints, uses a replica if one is healthy.
+    Users who wrote recently keep reading from the primary when read-your-writes is on.
+    """
+    replica = replica_set.choose()
+    if replica is not None and settings.DB_READ_YOUR_WRITES_TIME and token:
+        user_id = get_token_user_id(token)
+        if user_id is not None and await is_user_pinned_to_primary(user_id):
+            replica = None
+
+    if replica is None:
+        yield primary_session
+        return
+
+    async with replica_sessions[replica]() as session:
+        try:
+            yield session
+        except Exception as error:  # noqa: PIE786
+            if is_connection_error(error):
+                replica_set.eject(replica)
+            raise
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Short-lived read-only session on a healthy replica or the primary, not bound to a request.
+    For work shared by several requests, which must not use a session closed when one of them is cancelled.
+    """
+    replica = replica_set.choose()
+    session_factory = async_session if replica is None else replica_sessions[replica]
+    async with session_factory() as session:
+        try:
+            yield session
+        except Exception as error:  # noqa: PIE786
+            if replica is not None and is_connection_error(error):
+                replica_set.eject(replica)
+            raise
+
+
+def get_read_session_factory() -> Callable[[], AsyncContextManager[AsyncSession]]:
+    return read_session
@@ -6,8 +6,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from app.api import api_router
-from app.metrics import metrics, prometheus_metrics
+from app.cache.leaderboard import leaderboard_invalidate
+from app.cache.ranking import bump_ranking_generation
+from app.metrics import PrometheusMiddleware, metrics
+from app.on_startup.leaderboard import start_leaderboard
+from app.on_startup.local_cache import start_local_cache
 from app.on_startup.redis import start_redis
+from app.on_startup.vote_buffer import flush_vote_buffer, start_vote_buffer
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from conf.config import settings
 
 
 def setup_middleware(app: FastAPI) -> None:
@@ -19,8 +26,9 @@ def setup_middleware(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=['*'],
         allow_headers=['*'],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
-    app.middleware('http')(prometheus_metrics)
+    app.add_middleware(PrometheusMiddleware)
 
 
 def setup_routers(app: FastAPI) -> None:
@@ -33,7 +41,22 @@ def setup_routers(app: FastAPI) -> None:
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info('START APP')
     await start_redis()
+    if settings.LEADERBOARD_ENABLED and settings.LEADERBOARD_REBUILD_ON_STARTUP:
+        await start_leaderboard()
+    elif not settings.LEADERBOARD_ENABLED:
+        # Writes do not maintain a disabled leaderboard, it is rebuilt once enabled again
+        await leaderboard_invalidate()
+    if not settings.PUBLICATIONS_PAGE_CACHE_ENABLED:
+        # Writes do not bump the generation of disabled pages, cached pages are abandoned
+        await bump_ranking_generation()
+    invalidation_listener = start_local_cache() if settings.LOCAL_CACHE_ENABLED else None
+    vote_flusher = start_vote_buffer() if settings.VOTE_WRITE_BEHIND_ENABLED else None
     yield
+    if invalidation_listener:
+        invalidation_listener.cancel()
+    if vote_flusher:
+        vote_flusher.cancel()
+        await flush_vote_buffer()
     logger.info('END APP')
 
 
@@ -1,12 +1,21 @@
 import os
+from contextvars import ContextVar
 from time import monotonic
 from typing import Any, Awaitable, Callable, Dict, List
 
 import prometheus_client
+from loguru import logger
 from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
 from prometheus_client.multiprocess import MultiProcessCollector
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from conf.config import settings
+
+EXCLUDED_PATHS = ('/favicon.ico', '/metrics')
+# Label of requests that did not match any route, e.g. 404 for unknown urls
+UNMATCHED_ENDPOINT = '<unmatched>'
 
 DEFAULT_BUCKETS = (
     0.005,
@@ -42,6 +51,20 @@ ERROR_COUNT = prometheus_client.Counter(
     ['method', 'endpoint', 'http_status'],
 )
 
+REQUESTS_IN_PROGRESS = prometheus_client.Gauge(
+    'http_requests_in_progress',
+    'Number of HTTP requests being processed',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+
+RESPONSE_SIZE = prometheus_client.Histogram(
+    'http_response_size_bytes',
+    'Size of HTTP response bodies',
+    ['method', 'endpoint'],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, float('+inf')),
+)
+
 # histogram_quantile(0.99, sum(rate(publication_integrations_latency_seconds[1m])) by (le, integration))
 # среднее время обработки за 1 мин
 INTEGRATIONS_LATENCY = prometheus_client.Histogram(
@@ -59,6 +82,78 @@ ROUTES_LATENCY = prometheus_client.Histogram(
     buckets=DEFAULT_BUCKETS,
 )
 
+INTEGRATIONS_BATCH_SIZE = prometheus_client.Histogram(
+    'publication_integrations_batch_size',
+    'Number of keys handled by one bulk integration call',
+    ['integration'],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, float('+inf')),
+)
+
+PASSWORD_HASHING_QUEUE_DEPTH = prometheus_client.Gauge(
+    'publication_password_hashing_queue_depth',
+    'Number of password hashing calls running or waiting for the pool',
+    multiprocess_mode='livesum',
+)
+
+DB_POOL_CHECKED_OUT = prometheus_client.Gauge(
+    'publication_db_pool_checked_out',
+    'Number of connections checked out from the pool',
+    ['pool'],
+    multiprocess_mode='livesum',
+)
+
+DB_POOL_OVERFLOW = prometheus_client.Gauge(
+    'publication_db_pool_overflow',
+    'Number of connections opened above the pool size',
+    ['pool'],
+    multiprocess_mode='livesum',
+)
+
+# histogram_quantile(0.99, sum(rate(publication_db_pool_checkout_wait_seconds_bucket[1m])) by (le, pool))
+DB_POOL_CHECKOUT_WAIT = prometheus_client.Histogram(
+    'publication_db_pool_checkout_wait_seconds',
+    'Time spent waiting for a pool connection',
+    ['pool'],
+    buckets=DEFAULT_BUCKETS,
+)
+
+# histogram_quantile(0.99, sum(rate(publication_sql_latency_seconds_bucket[1m])) by (le, statement))
+SQL_LATENCY = prometheus_client.Histogram(
+    'publication_sql_latency_seconds',
+    'SQL statement latency by normalized statement',
+    ['statement'],
+    buckets=DEFAULT_BUCKETS,
+)
+
+SQL_ROWS = prometheus_client.Histogram(
+    'publication_sql_rows',
+    'Rows returned or affected by SQL statements',
+    ['statement'],
+    buckets=(0, 1, 10, 100, 1_000, 10_000, float('+inf')),
+)
+
+SQL_QUERIES_PER_REQUEST = prometheus_client.Histogram(
+    'publication_sql_queries_per_request',
+    'Number of SQL statements executed by one HTTP request',
+    ['method', 'endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float('+inf')),
+)
+
+LOCAL_CACHE_REQUESTS = prometheus_client.Counter(
+    'publication_local_cache_requests_total',
+    'Total count of in-process cache lookups',
+    ['result'],
+)
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+
+# SQL statements executed by the current request
+request_query_counter: ContextVar[QueryCounter | None] = ContextVar('request_query_counter', default=None)
+
 
 def async_integrations_timer(
     func: Callable[..., Awaitable[Any]],
@@ -73,7 +168,7 @@ def async_integrations_timer(
 
 
 def metrics(request: Request) -> Response:
-    if 'prometheus_multiproc_dir' in os.environ:
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ or 'prometheus_multiproc_dir' in os.environ:
         registry = CollectorRegistry()
         MultiProcessCollector(registry)
     else:
@@ -82,19 +177,56 @@ def metrics(request: Request) -> Response:
     return Response(generate_latest(registry), headers={'Content-Type': CONTENT_TYPE_LATEST})
 
 
-async def prometheus_metrics(request: Request, call_next: Callable[..., Awaitable[Any]]) -> Awaitable[Any]:
-    method = request.method
-    path = request.url.path
-
-    start_time = monotonic()
-    response = await call_next(request)
-    process_time = monotonic() - start_time
-    if path in ['/favicon.ico', '/metrics']:
-        return response
-    REQUEST_COUNT.labels(method=method, endpoint=path, http_status=str(response.status_code)).inc()
-    ROUTES_LATENCY.labels(method=method, endpoint=path).observe(process_time)
-
-    if 400 <= response.status_code < 600:
-        ERROR_COUNT.labels(method=method, endpoint=path, http_status=str(response.status_code)).inc()
-
-    return response
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware, requests are labeled with the matched route template to keep label cardinality bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method=method).inc()
+        query_counter = QueryCounter()
+        query_counter_token = request_query_counter.set(query_counter)
+        start_time = monotonic()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            process_time = monotonic() - start_time
+            request_query_counter.reset(query_counter_token)
+            REQUESTS_IN_PROGRESS.labels(method=method).dec()
+
+            route = scope.get('route')
+            endpoint = route.path if route is not None else UNMATCHED_ENDPOINT
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, http_status=str(status_code)).inc()
+            ROUTES_LATENCY.labels(method=method, endpoint=endpoint).observe(process_time)
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
+            if 400 <= status_code < 600:
+                ERROR_COUNT.labels(method=method, endpoint=endpoint, http_status=str(status_code)).inc()
+
+            SQL_QUERIES_PER_REQUEST.labels(method=method, endpoint=endpoint).observe(query_counter.count)
+            if settings.SQL_QUERY_BUDGET and query_counter.count > settings.SQL_QUERY_BUDGET:
+                logger.warning(
+                    '{method} {endpoint} executed {count} SQL statements, the budget is {budget}',
+                    method=method,
+                    endpoint=endpoint,
+                    count=query_counter.count,
+                    budget=settings.SQL_QUERY_BUDGET,
+                )
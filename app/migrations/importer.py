@@ -0,0 +1,211 @@
+import csv
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic
+from typing import Any, Callable, Iterator, Mapping, Sequence
+
+from loguru import logger
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.migrations.operations import SCHEMA, backfill_publication_counters, delete_duplicated_votes, reset_sequence
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
+from app.models.publication.vote import Vote
+from conf.config import settings
+
+
+def _parse_datetime(value: Any) -> datetime:
+    # An empty value would be copied as NULL, the server default applies only when the column is left out
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+# Importable columns and their converters, in the order tables must be imported.
+# Passwords must already be hashed, publication counters are recalculated from votes.
+IMPORT_COLUMNS: dict[Table, dict[str, Callable[[Any], Any]]] = {
+    User.__table__: {'id': int, 'username': str, 'password': str},
+    Publication.__table__: {'id': int, 'text': str, 'author_id': int, 'publication_date': _parse_datetime},
+    Vote.__table__: {'id': int, 'user_id': int, 'publication_id': int, 'value': int},
+}
+
+
+def read_rows(path: Path) -> Iterator[Sequence[Any]]:
+    """
+    Lazily reads a CSV file with a header or a file with one JSON object per line.
+    The first row is the header, for JSON it is the keys of the first object.
+    """
+    with open(path, newline='') as file:
+        if path.suffix == '.csv':
+            yield from csv.reader(file)
+            return
+
+        header: list[str] | None = None
+        for line in file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if header is None:
+                header = list(row)
+                yield header
+            yield [row.get(column) for column in header]
+
+
+async def copy_rows(connection: AsyncConnection, table: Table, path: Path, batch_size: int) -> int:
+    """
+    Streams rows into `table` with COPY in batches of `batch_size`, all batches are committed together.
+    Copied columns are the importable columns present in the header, the rest get their defaults.
+    """
+    rows = read_rows(path)
+    header = next(rows, None)
+    if not header:
+        return 0
+    converters = [
+        (column, header.index(column), convert) for column, convert in IMPORT_COLUMNS[table].items() if column in header
+    ]
+    columns = [column for column, _, _ in converters]
+
+    driver_connection: Any = (await connection.get_raw_connection()).driver_connection
+    start_time = monotonic()
+    count = 0
+    async with driver_connection.transaction():
+        batch = []
+        for line, row in enumerate(rows, start=2):
+            try:
+                batch.append(tuple([convert(row[position]) for _, position, convert in converters]))
+            except (IndexError, TypeError, ValueError) as error:
+                raise ValueError(f'{path}:{line}: invalid row {row!r}') from error
+            if len(batch) < batch_size:
+                continue
+
+            count += await _copy_batch(driver_connection, table, columns, batch)
+            batch = []
+            logger.info(
+                '{table}: {count} rows, {speed:.0f} rows/s',
+                table=table.name,
+                count=count,
+                speed=count / (monotonic() - start_time),
+            )
+        count += await _copy_batch(driver_connection, table, columns, batch)
+
+    logger.info(
+        'Imported {count} {table} rows in {time:.1f}s, {speed:.0f} rows/s',
+        count=count,
+        table=table.name,
+        time=monotonic() - start_time,
+        speed=count / (monotonic() - start_time),
+    )
+    return count
+
+
+async def _copy_batch(driver_connection: Any, table: Table, columns: list[str], batch: list[tuple[Any, ...]]) -> int:
+    if batch:
+        await driver_connection.copy_records_to_table(table.name, records=batch, columns=columns, schema_name=SCHEMA)
+    return len(batch)
+
+
+async def import_files(
+    engine: AsyncEngine, paths: Mapping[Table, Path], batch_size: int, defer_indexes: bool = False
+) -> dict[str, int]:
+    """
+    Imports files into their tables in dependency order and recalculates publication counters.
+    With `defer_indexes` secondary indexes and foreign keys of the imported tables are dropped before copying
+    and restored once at the end, which is several times faster than checking them row by row.
+    Until then upserts of votes fail and references are not checked, so the database must not serve requests.
+    Duplicated votes are resolved in favour of the latest one before the unique index is rebuilt.
+    Every index and foreign key is restored even if others fail, the failed ones are reported with an error.
+    """
+    counts = {}
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+        tables = [table for table in IMPORT_COLUMNS if table in paths]
+        foreign_keys: list[tuple[str, str, str]] = []
+        if defer_indexes:
+            for table in tables:
+                foreign_keys.extend(await _drop_foreign_keys(connection, table))
+                for index in table.indexes:
+                    await connection.execute(text(f'DROP INDEX IF EXISTS "{SCHEMA}"."{index.name}"'))
+
+        try:
+            for table in tables:
+                counts[table.name] = await copy_rows(connection, table, paths[table], batch_size)
+                await reset_sequence(connection, table.name)
+        finally:
+            if defer_indexes:
+                failed = await _create_indexes(connection, tables)
+                failed += await _add_foreign_keys(connection, foreign_keys)
+                if failed:
+                    raise RuntimeError(f'Could not restore {", ".join(failed)}, fix the data and create them by hand')
+
+        if Vote.__table__ in paths or Publication.__table__ in paths:
+            await backfill_publication_counters(connection, settings.MIGRATION_BATCH_SIZE)
+        for table in tables:
+            await connection.execute(text(f'ANALYZE "{SCHEMA}"."{table.name}"'))
+
+    return counts
+
+
+async def _drop_foreign_keys(connection: AsyncConnection, table: Table) -> list[tuple[str, str, str]]:
+    res = await connection.execute(
+        text(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+        ),
+        {'table': f'"{SCHEMA}"."{table.name}"'},
+    )
+    foreign_keys = [(table.name, name, definition) for name, definition in res]
+    for _, name, _ in foreign_keys:
+        await connection.execute(text(f'ALTER TABLE "{SCHEMA}"."{table.name}" DROP CONSTRAINT "{name}"'))
+
+    return foreign_keys
+
+
+async def _create_indexes(connection: AsyncConnection, tables: list[Table]) -> list[str]:
+    failed = []
+    for table in tables:
+        # Unique indexes go last, duplicated votes are looked up through the other ones
+        for index in sorted(table.indexes, key=lambda index: bool(index.unique)):
+            start_time = monotonic()
+            try:
+                if index.unique and table is Vote.__table__:
+                    duplicated_votes = await delete_duplicated_votes(connection, settings.MIGRATION_BATCH_SIZE)
+                    logger.info('Removed {count} duplicated votes', count=duplicated_votes)
+                await connection.run_sync(index.create, checkfirst=True)
+            except Exception:  # noqa: PIE786
+                logger.exception('Could not build {index}', index=index.name)
+                failed.append(str(index.name))
+                continue
+            logger.info('Built {index} in {time:.1f}s', index=index.name, time=monotonic() - start_time)
+
+    return failed
+
+
+async def _add_foreign_keys(connection: AsyncConnection, foreign_keys: list[tuple[str, str, str]]) -> list[str]:
+    # Constraints are restored before validation, so rows with missing references fail only the validation
+    failed = []
+    restored = []
+    for table, name, definition in foreign_keys:
+        try:
+            await connection.execute(
+                text(f'ALTER TABLE "{SCHEMA}"."{table}" ADD CONSTRAINT "{name}" {definition} NOT VALID')
+            )
+        except Exception:  # noqa: PIE786
+            logger.exception('Could not add {name}', name=name)
+            failed.append(name)
+            continue
+        restored.append((table, name))
+
+    for table, name in restored:
+        start_time = monotonic()
+        try:
+            await connection.execute(text(f'ALTER TABLE "{SCHEMA}"."{table}" VALIDATE CONSTRAINT "{name}"'))
+        except Exception:  # noqa: PIE786
+            logger.exception('Could not validate {name}, it is left not valid', name=name)
+            failed.append(name)
+            continue
+        logger.info('Validated {name} in {time:.1f}s', name=name, time=monotonic() - start_time)
+
+    return failed
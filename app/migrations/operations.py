@@ -0,0 +1,100 @@
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models.meta import metadata
+
+SCHEMA = metadata.schema
+
+
+async def create_index_concurrently(
+    connection: AsyncConnection, name: str, table: str, columns: Sequence[str], unique: bool = False
+) -> None:
+    """
+    Creates an index without blocking writes, `connection` must be in autocommit mode.
+    An invalid index left by an interrupted build is dropped and built again.
+    """
+    is_valid = await connection.scalar(
+        text(
+            'SELECT i.indisvalid FROM pg_index i '
+            'JOIN pg_class c ON c.oid = i.indexrelid JOIN pg_namespace n ON n.oid = c.relnamespace '
+            'WHERE n.nspname = :schema AND c.relname = :name'
+        ),
+        {'schema': SCHEMA, 'name': name},
+    )
+    if is_valid:
+        return
+    if is_valid is False:
+        await connection.execute(text(f'DROP INDEX CONCURRENTLY "{SCHEMA}"."{name}"'))
+
+    await connection.execute(
+        text(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY "{name}" '
+            f'ON "{SCHEMA}"."{table}" ({", ".join(columns)})'
+        )
+    )
+
+
+async def backfill_publication_counters(connection: AsyncConnection, batch_size: int) -> None:
+    """
+    Recalculates rating, likes and dislikes from votes, one range of publication ids per statement.
+    """
+    min_id, max_id = (await connection.execute(text(f'SELECT min(id), max(id) FROM "{SCHEMA}".publication'))).one()
+    if min_id is None:
+        return
+
+    for start in range(min_id, max_id + 1, batch_size):
+        await connection.execute(
+            text(
+                f'UPDATE "{SCHEMA}".publication p '
+                'SET rating = coalesce(counters.rating, 0), likes = counters.likes, dislikes = counters.dislikes '
+                'FROM ('
+                '    SELECT p.id, sum(v.value) AS rating, '
+                '    count(v.id) FILTER (WHERE v.value = 1) AS likes, '
+                '    count(v.id) FILTER (WHERE v.value = -1) AS dislikes '
+                f'    FROM "{SCHEMA}".publication p LEFT JOIN "{SCHEMA}".votes v ON v.publication_id = p.id '
+                '    WHERE p.id >= :start AND p.id < :end '
+                '    GROUP BY p.id'
+                ') counters '
+                'WHERE p.id = counters.id'
+            ),
+            {'start': start, 'end': start + batch_size},
+        )
+
+
+async def delete_duplicated_votes(connection: AsyncConnection, batch_size: int) -> int:
+    """
+    Keeps the latest vote of every user for a publication, one range of vote ids per statement.
+    Returns the number of removed votes.
+    """
+    min_id, max_id = (await connection.execute(text(f'SELECT min(id), max(id) FROM "{SCHEMA}".votes'))).one()
+    if min_id is None:
+        return 0
+
+    count = 0
+    for start in range(min_id, max_id + 1, batch_size):
+        res = await connection.execute(
+            text(
+                f'DELETE FROM "{SCHEMA}".votes v '
+                'WHERE v.id >= :start AND v.id < :end AND EXISTS ('
+                f'    SELECT 1 FROM "{SCHEMA}".votes newer '
+                '    WHERE newer.publication_id = v.publication_id AND newer.user_id = v.user_id AND newer.id > v.id'
+                ')'
+            ),
+            {'start': start, 'end': start + batch_size},
+        )
+        count += res.rowcount
+    return count
+
+
+async def reset_sequence(connection: AsyncConnection, table: str) -> None:
+    """
+    Moves the id sequence past rows inserted with explicit ids.
+    """
+    await connection.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('\"{SCHEMA}\".\"{table}\"', 'id'), "
+            f'coalesce((SELECT max(id) FROM "{SCHEMA}"."{table}"), 0) + 1, false)'
+        )
+    )
@@ -0,0 +1,47 @@
+from loguru import logger
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.migrations.versions import v0001_hot_query_indexes
+from app.models.meta import metadata
+
+MIGRATIONS = [v0001_hot_query_indexes]
+
+# Serializes migrations of workers starting at the same time.
+MIGRATIONS_LOCK_ID = 7_310_001
+
+schema_migrations = Table(
+    'schema_migrations',
+    MetaData(schema=metadata.schema),
+    Column('version', Integer, primary_key=True),
+    Column('name', String),
+    Column('applied_at', DateTime(timezone=True), server_default=func.now()),
+)
+
+
+async def migrate(engine: AsyncEngine) -> list[int]:
+    """
+    Applies pending migrations in version order, returns applied versions.
+    Migrations run in autocommit mode so they can build indexes concurrently and commit backfills in batches.
+    """
+    applied_versions = []
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+        await connection.execute(select(func.pg_advisory_lock(MIGRATIONS_LOCK_ID)))
+        try:
+            await connection.run_sync(schema_migrations.create, checkfirst=True)
+            done_versions = set(await connection.scalars(select(schema_migrations.c.version)))
+
+            for migration in sorted(MIGRATIONS, key=lambda migration: migration.VERSION):
+                if migration.VERSION in done_versions:
+                    continue
+
+                name = migration.__name__.rsplit('.', 1)[-1]
+                logger.info('Applying migration {name}', name=name)
+                await migration.upgrade(connection)
+                await connection.execute(insert(schema_migrations).values(version=migration.VERSION, name=name))
+                applied_versions.append(migration.VERSION)
+        finally:
+            await connection.execute(select(func.pg_advisory_unlock(MIGRATIONS_LOCK_ID)))
+
+    return applied_versions
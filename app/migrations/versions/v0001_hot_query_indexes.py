@@ -0,0 +1,39 @@
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.migrations.operations import (
+    SCHEMA,
+    backfill_publication_counters,
+    create_index_concurrently,
+    delete_duplicated_votes,
+)
+from conf.config import settings
+
+VERSION = 1
+
+
+async def upgrade(connection: AsyncConnection) -> None:
+    for column in ('rating', 'likes', 'dislikes'):
+        # Columns left nullable by an earlier interrupted run are fixed up as well
+        await connection.execute(
+            text(
+                f'ALTER TABLE "{SCHEMA}".publication ADD COLUMN IF NOT EXISTS {column} integer NOT NULL DEFAULT 0, '
+                f'ALTER COLUMN {column} SET DEFAULT 0, ALTER COLUMN {column} SET NOT NULL'
+            )
+        )
+
+    await create_index_concurrently(connection, 'ix_votes_publication_id', 'votes', ['publication_id'])
+
+    duplicated_votes = await delete_duplicated_votes(connection, settings.MIGRATION_BATCH_SIZE)
+    logger.info('Removed {count} duplicated votes', count=duplicated_votes)
+    await create_index_concurrently(
+        connection, 'ix_votes_user_id_publication_id', 'votes', ['user_id', 'publication_id'], unique=True
+    )
+
+    # Counters are recalculated on every run until the migration is recorded,
+    # a run interrupted after adding the columns must not leave them at zero
+    await backfill_publication_counters(connection, settings.MIGRATION_BATCH_SIZE)
+
+    await create_index_concurrently(connection, 'ix_publication_rating_id', 'publication', ['rating', 'id'])
+    await create_index_concurrently(connection, 'ix_publication_author_id', 'publication', ['author_id', 'id'])
@@ -1,7 +1,7 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 
 from app.models.meta import Base
 from app.models.publication.vote import Vote
@@ -9,10 +9,19 @@ from app.models.publication.vote import Vote
 
 class Publication(Base):
     __tablename__ = 'publication'
+    __table_args__ = (
+        Index('ix_publication_rating_id', 'rating', 'id'),
+        Index('ix_publication_author_id', 'author_id', 'id'),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     text: Mapped[str] = mapped_column(String)
     publication_date: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey('user.id'))
 
-    votes: Mapped[Vote] = relationship('Vote', backref='publication', lazy='selectin')
+    rating: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    likes: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+    dislikes: Mapped[int] = mapped_column(Integer, default=0, server_default='0')
+
+    votes: Mapped[list[Vote]] = relationship('Vote', backref=backref('publication', lazy='raise'), lazy='raise')
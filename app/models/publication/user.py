@@ -1,5 +1,5 @@
 from sqlalchemy import Integer, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, backref, mapped_column, relationship
 
 from app.models.meta import Base
 from app.models.publication.publication import Publication
@@ -14,4 +14,6 @@ class User(Base):
 
     password: Mapped[str] = mapped_column(String)
 
-    publications: Mapped[list[Publication]] = relationship('Publication', backref='author', lazy='selectin')
+    publications: Mapped[list[Publication]] = relationship(
+        'Publication', backref=backref('author', lazy='raise'), lazy='raise'
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.meta import Base
@@ -6,6 +6,11 @@ from app.models.meta import Base
 
 class Vote(Base):
     __tablename__ = 'votes'
+    __table_args__ = (
+        Index('ix_votes_user_id_publication_id', 'user_id', 'publication_id', unique=True),
+        Index('ix_votes_publication_id', 'publication_id'),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     value: Mapped[int] = mapped_column(Integer)
 
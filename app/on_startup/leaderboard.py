@@ -0,0 +1,24 @@
+from loguru import logger
+
+from app.cache.leaderboard import acquire_rebuild_lock, leaderboard_is_built, rebuild_leaderboard, release_rebuild_lock
+from app.crud.publication import stream_publication_ratings
+from app.db.postgres import async_session
+from conf.config import settings
+
+
+async def start_leaderboard(force: bool = False) -> None:
+    if not force and await leaderboard_is_built():
+        return
+    if not force and not await acquire_rebuild_lock():
+        # Another worker is rebuilding it, top publications are read from Postgres meanwhile
+        return
+
+    try:
+        async with async_session() as session:
+            count = await rebuild_leaderboard(
+                stream_publication_ratings(session, settings.LEADERBOARD_REBUILD_BATCH_SIZE),
+            )
+    finally:
+        if not force:
+            await release_rebuild_lock()
+    logger.info('Leaderboard rebuilt with {count} publications', count=count)
@@ -0,0 +1,26 @@
+import asyncio
+
+from loguru import logger
+
+from app.cache.local import local_cache
+from app.db.redis import get_redis
+from conf.config import settings
+
+
+async def listen_invalidations() -> None:
+    while True:
+        try:
+            async with get_redis().pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(settings.LOCAL_CACHE_INVALIDATION_CHANNEL)
+                # Invalidations published while we were not subscribed are lost.
+                local_cache.clear()
+                async for message in pubsub.listen():
+                    local_cache.pop(message['data'].decode())
+        except Exception:  # noqa: PIE786
+            # Resubscribing clears the local cache, missed invalidations cannot serve stale values
+            logger.exception('Local cache invalidation listener failed')
+            await asyncio.sleep(1)
+
+
+def start_local_cache() -> asyncio.Task[None]:
+    return asyncio.create_task(listen_invalidations())
@@ -0,0 +1,85 @@
+import asyncio
+from collections import Counter
+from typing import AsyncContextManager, Callable
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.invalidation import publications_rescored, publications_voted
+from app.cache.vote_buffer import (
+    ack_buffered_votes,
+    ack_vote_tombstones,
+    acquire_flush_lock,
+    get_vote_tombstones,
+    release_flush_lock,
+    take_buffered_votes,
+)
+from app.crud.publication import get_publication_ratings
+from app.crud.vote import delete_vote, upsert_votes, vote_rating_delta
+from app.db.postgres import async_session
+from conf.config import settings
+
+
+async def flush_vote_buffer(session_factory: Callable[[], AsyncContextManager[AsyncSession]] = async_session) -> int:
+    """
+    Writes buffered votes to Postgres, returns the number of flushed votes.
+    Replaying a batch is harmless: unchanged votes do not touch ratings,
+    and cached scores of a replayed batch are reread from Postgres in case its deltas were lost.
+    Votes deleted meanwhile are deleted again after writing, votes that cannot be written are dropped.
+    """
+    if not await acquire_flush_lock():
+        return 0
+
+    try:
+        votes, replayed = await take_buffered_votes()
+        for start in range(0, len(votes), settings.VOTE_WRITE_BEHIND_BATCH_SIZE):
+            batch = votes[start : start + settings.VOTE_WRITE_BEHIND_BATCH_SIZE]
+            async with session_factory() as session:
+                written_votes = await upsert_votes(session, batch)
+            if len(written_votes) < len(batch):
+                logger.warning(
+                    'Dropped {count} buffered votes of unknown users or for unknown publications',
+                    count=len(batch) - len(written_votes),
+                )
+
+            rating_deltas: Counter[int] = Counter()
+            for vote in written_votes:
+                rating_deltas[vote.publication_id] += vote_rating_delta(vote.value, vote.inserted)
+            await publications_voted(rating_deltas)
+
+        rescored_ids = {vote['publication_id'] for vote in votes} if replayed else set()
+        tombstones = await get_vote_tombstones()
+        if tombstones or rescored_ids:
+            await _apply_vote_tombstones(session_factory, tombstones, rescored_ids)
+
+        await ack_vote_tombstones(tombstones)
+        await ack_buffered_votes()
+    finally:
+        await release_flush_lock()
+
+    return len(votes)
+
+
+async def _apply_vote_tombstones(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    tombstones: list[tuple[int, int]],
+    rescored_ids: set[int],
+) -> None:
+    async with session_factory() as session:
+        for user_id, publication_id in tombstones:
+            await delete_vote(session, publication_id, user_id)
+            rescored_ids.add(publication_id)
+        await publications_rescored(await get_publication_ratings(session, rescored_ids))
+
+
+async def flush_votes_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.VOTE_WRITE_BEHIND_FLUSH_INTERVAL)
+        try:
+            await flush_vote_buffer()
+        except Exception:  # noqa: PIE786
+            logger.exception('Vote buffer flush failed')
+
+
+def start_vote_buffer() -> asyncio.Task[None]:
+    return asyncio.create_task(flush_votes_periodically())
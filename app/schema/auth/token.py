@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.schema.crud import IdField
+
 
 class Token(BaseModel):
     access_token: str
@@ -8,3 +10,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None
+    user_id: int | None = None
+
+
+class Principal(IdField):
+    username: str
@@ -1,18 +1,21 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 
 from app.schema.crud import IdField
-from app.utils.auth.password import hash_password
+from app.schema.publication.publication import PublicationSummaryDTO
+from app.schema.serialization import trusted_serializer
 
 
 class UserResponse(IdField):
     username: str = Field(description='Имя пользователя')
 
 
+class AuthorResponse(UserResponse):
+    publications: list[PublicationSummaryDTO] = Field(description='Публикации пользователя')
+
+
 class UserDTO(BaseModel):
     username: str = Field(description='Имя пользователя')
     password: str = Field(description='Пароль')
 
-    @field_validator('password')
-    @classmethod
-    def hash_password(cls, v: str) -> str:
-        return hash_password(v)
+
+serialize_author = trusted_serializer(AuthorResponse)
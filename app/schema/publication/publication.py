@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Self
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field
 
 from app.schema.crud import IdField
+from app.schema.serialization import trusted_serializer
 from app.schema.vote.vote import Vote, VoteValue
 
 
@@ -16,17 +16,19 @@ class NewPublication(Publication, IdField):
     publication_date: datetime = Field(description='Дата публикации')
 
 
-class PublicationDTO(NewPublication, IdField):
-    votes: list[Vote] = Field(description='Список оценок публикации')
-    rating: int | None = Field(None, description='Рейтинг публикации (положительные - отрицательные оценки)')
+class PublicationSummaryDTO(NewPublication):
+    rating: int = Field(0, description='Рейтинг публикации (положительные - отрицательные оценки)')
 
-    @model_validator(mode='after')
-    def calculate_rating(self) -> Self:
-        if not self.rating:
-            self.rating = sum([vote.value for vote in self.votes])
 
-        return self
+class PublicationDTO(PublicationSummaryDTO):
+    likes: int = Field(0, description='Количество положительных оценок')
+    dislikes: int = Field(0, description='Количество отрицательных оценок')
+    votes: list[Vote] = Field(description='Список оценок публикации')
 
 
 class VoteForPublication(VoteValue):
     pass
+
+
+serialize_publication_summary = trusted_serializer(PublicationSummaryDTO)
+serialize_publication = trusted_serializer(PublicationDTO)
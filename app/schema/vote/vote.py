@@ -1,3 +1,5 @@
+from enum import Enum
+
 from pydantic import BaseModel, field_validator
 
 from app.schema.crud import IdField
@@ -20,3 +22,14 @@ class Vote(VoteValue):
 
 class VoteDTO(IdField, Vote):
     pass
+
+
+class VoteStatus(str, Enum):
+    CHANGED = 'changed'
+    UNCHANGED = 'unchanged'
+    NOT_FOUND = 'not_found'
+    ACCEPTED = 'accepted'
+
+
+class VoteResult(Vote):
+    status: VoteStatus
@@ -1,38 +1,46 @@
 from datetime import datetime, timedelta
-from typing import Annotated, Any
+from typing import Annotated, Any, AsyncGenerator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.user import get_user_by_username
+from app.cache.local import LocalCache
+from app.cache.primary_pin import pin_user_to_primary
+from app.cache.revoked_users import is_user_revoked
+from app.crud.user import get_user_by_username, update_user_password
 from app.db.postgres import get_session
 from app.models.publication.user import User
-from app.schema.auth.token import TokenData
+from app.schema.auth.token import Principal, TokenData
+from app.utils.auth.password import verify_password
 from conf.config import settings
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/v1/auth/token')
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/v1/auth/token', auto_error=False)
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+principal_cache = LocalCache(
+    max_items=settings.PRINCIPAL_CACHE_MAX_ITEMS,
+    max_bytes=settings.PRINCIPAL_CACHE_MAX_BYTES,
+    expire_time=settings.PRINCIPAL_CACHE_EXPIRE_TIME,
+)
 
 
 async def authenticate_user(session: AsyncSession, username: str, password: str) -> User:
     user = await get_user_by_username(session, username)
-    if not user or not verify_password(password, user.password):
+    is_valid, new_hash = await verify_password(password, user.password) if user else (False, None)
+    if not user or not is_valid or await is_user_revoked(user.id):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Incorrect username or password',
             headers={'WWW-Authenticate': 'Bearer'},
         )
+    if new_hash:
+        await update_user_password(session, user, new_hash)
     return user
 
 
@@ -45,10 +53,31 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta) -> str:
     return encoded_jwt
 
 
+def get_token_user_id(token: str) -> int | None:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get('uid')
+    return user_id if isinstance(user_id, int) else None
+
+
+async def get_principal_by_username(session: AsyncSession, username: str) -> Principal | None:
+    principal: Principal | None = principal_cache.get(username)
+    if principal is None:
+        user = await get_user_by_username(session, username=username)
+        if user is None:
+            return None
+        principal = Principal(id=user.id, username=user.username)
+        principal_cache.set(username, principal, len(principal.model_dump_json()))
+
+    return principal
+
+
 async def get_current_user(
     session: Annotated[AsyncSession, Depends(get_session)],
     token: Annotated[str, Depends(oauth2_scheme)],
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Could not validate credentials',
@@ -59,10 +88,27 @@ async def get_current_user(
         username: str | None = payload.get('sub')
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
+        token_data = TokenData(username=username, user_id=payload.get('uid'))
+    except (JWTError, ValidationError):
         raise credentials_exception
-    user = await get_user_by_username(session, username=token_data.username)  # type: ignore
-    if user is None:
+
+    principal: Principal | None
+    if token_data.user_id is not None:
+        principal = Principal(id=token_data.user_id, username=username)
+    else:
+        # Tokens issued before the user id claim was added
+        principal = await get_principal_by_username(session, username)
+    if principal is None or await is_user_revoked(principal.id):
         raise credentials_exception
-    return user
+    return principal
+
+
+async def get_current_writer(
+    current_user: Annotated[Principal, Depends(get_current_user)],
+) -> AsyncGenerator[Principal, None]:
+    """
+    Current user of an endpoint that writes, their following reads go to the primary for a while.
+    """
+    yield current_user
+    if settings.DB_READ_YOUR_WRITES_TIME:
+        await pin_user_to_primary(current_user.id)
@@ -1,5 +1,50 @@
-from app.utils.auth.jwt import pwd_context
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
 
+from passlib.context import CryptContext
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from app.metrics import PASSWORD_HASHING_QUEUE_DEPTH
+from app.utils.exceptions import PasswordHashingBusyError
+from conf.config import settings
+
+T = TypeVar('T')
+
+# Hashes with other rounds are updated on the next successful login.
+pwd_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
+# bcrypt releases the GIL, so threads keep it off the event loop.
+_hashing_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix='password')
+_pending_hashing = 0
+
+
+async def _run_hashing(func: Callable[..., T], *args: Any) -> T:
+    global _pending_hashing
+
+    if _pending_hashing >= settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE_SIZE:
+        raise PasswordHashingBusyError()
+
+    _pending_hashing += 1
+    PASSWORD_HASHING_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hashing_pool, func, *args)
+    finally:
+        _pending_hashing -= 1
+        PASSWORD_HASHING_QUEUE_DEPTH.dec()
+
+
+async def hash_password(password: str) -> str:
+    return await _run_hashing(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Returns whether the password matches and a new hash if the stored one uses outdated settings.
+    """
+    return await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -5,14 +5,28 @@ from fastapi import HTTPException, status
 
 USER_ALL_READY_EXIST = 'User all ready exist'
 PUBLICATION_NOT_FOUND = 'Publication with id = {id} - not found'
+USER_NOT_FOUND = 'User with id = {id} - not found'
 PUBLICATION_FORBIDDEN = 'You do not have permission for this publication'
+INVALID_CURSOR = 'Invalid pagination cursor'
+PASSWORD_HASHING_BUSY = 'Too many authentication requests, try again later'
+INVALID_CREDENTIALS = 'Could not validate credentials'
 
 
-def handle_domain_error(func: Callable[[Any, Any, Any], Any] | Callable[[Any, Any], Any]) -> Any:
+def handle_domain_error(func: Callable[..., Any]) -> Any:
     @wraps(func)
     async def wrapper(*args: tuple[Any], **kwargs: dict[Any, Any]) -> Callable[[Any], Any]:
         try:
             return await func(*args, **kwargs)
+        except DomainUnavailableError as error:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error), headers={'Retry-After': '1'}
+            )
+
+        except DomainUnauthorizedError as error:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail=str(error), headers={'WWW-Authenticate': 'Bearer'}
+            )
+
         except DomainForbiddenError as error:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(error))
 
@@ -34,6 +48,11 @@ class UserExistError(DomainError):
         super().__init__(USER_ALL_READY_EXIST)
 
 
+class InvalidCursorError(DomainError):
+    def __init__(self) -> None:
+        super().__init__(INVALID_CURSOR)
+
+
 class DomainNotFoundError(DomainError):
     pass
 
@@ -43,6 +62,20 @@ class PublicationNotFoundError(DomainNotFoundError):
         super().__init__(PUBLICATION_NOT_FOUND.format(id=id))
 
 
+class UserNotFoundError(DomainNotFoundError):
+    def __init__(self, id: int) -> None:
+        super().__init__(USER_NOT_FOUND.format(id=id))
+
+
+class DomainUnauthorizedError(DomainError):
+    pass
+
+
+class PrincipalNotFoundError(DomainUnauthorizedError):
+    def __init__(self) -> None:
+        super().__init__(INVALID_CREDENTIALS)
+
+
 class DomainForbiddenError(Exception):
     pass
 
@@ -50,3 +83,12 @@ class DomainForbiddenError(Exception):
 class PublicationForbiddenError(DomainForbiddenError):
     def __init__(self) -> None:
         super().__init__(PUBLICATION_FORBIDDEN)
+
+
+class DomainUnavailableError(DomainError):
+    pass
+
+
+class PasswordHashingBusyError(DomainUnavailableError):
+    def __init__(self) -> None:
+        super().__init__(PASSWORD_HASHING_BUSY)
@@ -0,0 +1,23 @@
+import base64
+
+import orjson
+
+from app.utils.exceptions import InvalidCursorError
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(rating: int, publication_id: int) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([rating, publication_id])).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        rating, publication_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+    except (TypeError, ValueError):
+        raise InvalidCursorError()
+
+    if not isinstance(rating, int) or not isinstance(publication_id, int):
+        raise InvalidCursorError()
+
+    return rating, publication_id
@@ -0,0 +1,35 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from benchmarks.report import compare
+
+
+def main(baseline_path: Path, current_path: Path, max_regression: float | None) -> int:
+    baseline = json.loads(baseline_path.read_text())
+    current = json.loads(current_path.read_text())
+    print(f'{baseline["commit"]} -> {current["commit"]}, positive changes are improvements')
+
+    regressions = []
+    for name, changes in compare(baseline, current).items():
+        print(name, ', '.join(f'{key} {change:+.1f}%' for key, change in changes.items()))
+        if max_regression is not None and min(changes.values()) < -max_regression:
+            regressions.append(name)
+
+    if regressions:
+        print(f'Regressed by more than {max_regression}%: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares two benchmark reports')
+    parser.add_argument('baseline', type=Path)
+    parser.add_argument('current', type=Path)
+    parser.add_argument(
+        '--max-regression', type=float, help='Exit with an error if any metric is worse by more percent'
+    )
+    args = parser.parse_args()
+
+    sys.exit(main(args.baseline, args.current, args.max_regression))
@@ -0,0 +1,58 @@
+from statistics import fmean, quantiles
+from typing import Any, Mapping, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(latencies: Sequence[float], statuses: Mapping[int, int], duration: float) -> dict[str, Any]:
+    """
+    Summarizes one scenario run, latencies and duration are in seconds, reported latencies are in milliseconds.
+    """
+    requests = sum(statuses.values())
+    if len(latencies) > 1:
+        cut_points = quantiles(latencies, n=100, method='inclusive')
+        latency_percentiles = {f'p{percentile}': cut_points[percentile - 1] * 1000 for percentile in PERCENTILES}
+    else:
+        latency_percentiles = {f'p{percentile}': sum(latencies) * 1000 for percentile in PERCENTILES}
+
+    return {
+        'requests': requests,
+        'errors': sum(count for status_code, count in statuses.items() if status_code >= 400),
+        'statuses': {str(status_code): count for status_code, count in sorted(statuses.items())},
+        'duration_s': duration,
+        'throughput_rps': requests / duration if duration else 0.0,
+        'latency_ms': {
+            **latency_percentiles,
+            'mean': fmean(latencies) * 1000 if latencies else 0.0,
+            'max': max(latencies, default=0.0) * 1000,
+        },
+    }
+
+
+def compare(baseline: Mapping[str, Any], current: Mapping[str, Any]) -> dict[str, dict[str, float]]:
+    """
+    Returns relative changes in percent of throughput and latency percentiles for scenarios present in both reports.
+    Positive values are improvements.
+    """
+    changes = {}
+    for name, result in current['scenarios'].items():
+        if name not in baseline['scenarios']:
+            continue
+        baseline_result = baseline['scenarios'][name]
+        scenario_changes = {'throughput_rps': _change(baseline_result['throughput_rps'], result['throughput_rps'])}
+        for percentile in PERCENTILES:
+            key = f'p{percentile}'
+            scenario_changes[key] = _change(
+                baseline_result['latency_ms'][key], result['latency_ms'][key], lower_is_better=True
+            )
+        changes[name] = scenario_changes
+
+    return changes
+
+
+def _change(baseline: float, current: float, lower_is_better: bool = False) -> float:
+    if not baseline:
+        return 0.0
+    if lower_is_better:
+        return (baseline - current) / baseline * 100
+    return (current - baseline) / baseline * 100
@@ -0,0 +1,172 @@
+import json
+import random
+import asyncio
+import argparse
+import subprocess
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, AsyncIterator
+
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy import text
+
+from app.db.postgres import engine
+from app.main import create_app
+from app.migrations.operations import SCHEMA
+from app.on_startup.redis import start_redis
+from benchmarks.report import summarize
+from benchmarks.scenarios import SCENARIOS, Dataset, Scenario
+from conf.config import settings
+
+# Settings that change the measured code paths of an in-process run
+REPORTED_SETTINGS = (
+    'DB_POOL_SIZE',
+    'LEADERBOARD_ENABLED',
+    'LOCAL_CACHE_ENABLED',
+    'PASSWORD_HASH_ROUNDS',
+    'PUBLICATIONS_PAGE_CACHE_ENABLED',
+    'SQL_METRICS_ENABLED',
+    'VOTE_WRITE_BEHIND_ENABLED',
+)
+
+
+async def load_dataset(hot_publications: int, page_size: int) -> Dataset:
+    async with engine.connect() as connection:
+        users, publications, votes = (
+            await connection.execute(
+                text(
+                    f'SELECT (SELECT coalesce(max(id), 0) FROM "{SCHEMA}"."user"), '
+                    f'(SELECT coalesce(max(id), 0) FROM "{SCHEMA}".publication), '
+                    f'(SELECT count(*) FROM "{SCHEMA}".votes)'
+                )
+            )
+        ).one()
+    if not users or not publications:
+        raise RuntimeError('Database is empty, seed it with `python -m benchmarks.seed` first')
+
+    return Dataset(users, publications, votes, hot_publications, page_size)
+
+
+@asynccontextmanager
+async def benchmark_client(base_url: str | None) -> AsyncIterator[AsyncClient]:
+    """
+    Sends requests to a running server, or to the app in this process when `base_url` is not set.
+    """
+    if base_url:
+        async with AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(app=app, base_url='http://benchmark', timeout=60) as client:
+            yield client
+
+
+async def drive(
+    client: AsyncClient, scenario: Scenario, dataset: Dataset, rng: random.Random, concurrency: int, requests: int
+) -> tuple[list[float], Counter[int], float]:
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    sent = 0
+
+    async def worker() -> None:
+        nonlocal sent
+        while sent < requests:
+            sent += 1
+            request = await scenario(client, dataset, rng)
+            start_time = perf_counter()
+            response = await client.send(request)
+            latencies.append(perf_counter() - start_time)
+            statuses[response.status_code] += 1
+
+    start_time = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return latencies, statuses, perf_counter() - start_time
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, check=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(
+    scenarios: list[str],
+    base_url: str | None,
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    seed: int,
+    hot_publications: int,
+    page_size: int,
+    output: Path,
+) -> None:
+    await start_redis()
+    dataset = await load_dataset(hot_publications, page_size)
+    report: dict[str, Any] = {
+        'commit': current_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'target': base_url or 'in-process',
+        'concurrency': concurrency,
+        'seed': seed,
+        'dataset': {'users': dataset.users, 'publications': dataset.publications, 'votes': dataset.votes},
+        'settings': {name: getattr(settings, name) for name in REPORTED_SETTINGS} if not base_url else {},
+        'scenarios': {},
+    }
+
+    async with benchmark_client(base_url) as client:
+        for name in scenarios:
+            # Every scenario sees the same sequence of requests on every run
+            rng = random.Random(f'{seed}:{name}')
+            await drive(client, SCENARIOS[name], dataset, rng, concurrency, warmup)
+            result = summarize(*await drive(client, SCENARIOS[name], dataset, rng, concurrency, requests))
+            report['scenarios'][name] = result
+            logger.info(
+                '{name}: {rps:.0f} rps, p50 {p50:.1f}ms, p95 {p95:.1f}ms, p99 {p99:.1f}ms, {errors} errors',
+                name=name,
+                rps=result['throughput_rps'],
+                errors=result['errors'],
+                **{key: result['latency_ms'][key] for key in ('p50', 'p95', 'p99')},
+            )
+
+    output.write_text(json.dumps(report, indent=2))
+    logger.info('Report written to {output}', output=output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures throughput and latency of the API on a seeded dataset')
+    parser.add_argument(
+        '--scenario', action='append', choices=list(SCENARIOS), dest='scenarios', help='Defaults to all scenarios'
+    )
+    parser.add_argument('--base-url', help='Benchmark a running server instead of the app in this process')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=5000, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=500, help='Requests per scenario sent before measuring')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--hot-publications', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=settings.PUBLICATIONS_PAGE_SIZE_MAX)
+    parser.add_argument('--output', type=Path, default=Path('benchmark.json'))
+    args = parser.parse_args()
+
+    asyncio.run(
+        main(
+            args.scenarios or list(SCENARIOS),
+            args.base_url,
+            args.concurrency,
+            args.requests,
+            args.warmup,
+            args.seed,
+            args.hot_publications,
+            args.page_size,
+            args.output,
+        )
+    )
@@ -0,0 +1,80 @@
+import random
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from httpx import AsyncClient, Request
+
+from app.cache.cache import redis_drop_key
+from app.schema.publication.publication import Publication
+from app.utils.auth.jwt import create_access_token
+from benchmarks.seed import BENCHMARK_PASSWORD, benchmark_username
+from conf.config import settings
+
+API_URL = f'{settings.API_PREFIX}{settings.API_V1_PREFIX}'
+
+
+class Dataset:
+    def __init__(self, users: int, publications: int, votes: int, hot_publications: int, page_size: int) -> None:
+        self.users = users
+        self.publications = publications
+        self.votes = votes
+        # Publications requested by the cache hit scenario, small enough to stay cached
+        self.hot_publications = min(hot_publications, publications)
+        self.page_size = page_size
+        self._tokens: dict[int, str] = {}
+
+    def token(self, user_id: int) -> str:
+        if user_id not in self._tokens:
+            self._tokens[user_id] = create_access_token(
+                data={'sub': benchmark_username(user_id), 'uid': user_id}, expires_delta=timedelta(days=1)
+            )
+        return self._tokens[user_id]
+
+
+# Builds the next request, work done here is not included in the request latency
+Scenario = Callable[[AsyncClient, Dataset, random.Random], Awaitable[Request]]
+
+
+async def top_publications(client: AsyncClient, dataset: Dataset, rng: random.Random) -> Request:
+    return client.build_request(
+        'GET',
+        f'{API_URL}/publication',
+        params={'limit': dataset.page_size, 'skip': rng.randrange(10) * dataset.page_size},
+    )
+
+
+async def publication_cache_hit(client: AsyncClient, dataset: Dataset, rng: random.Random) -> Request:
+    return client.build_request('GET', f'{API_URL}/publication/{rng.randint(1, dataset.hot_publications)}')
+
+
+async def publication_cache_miss(client: AsyncClient, dataset: Dataset, rng: random.Random) -> Request:
+    publication_id = rng.randint(1, dataset.publications)
+    await redis_drop_key(Publication.__name__, publication_id)
+    return client.build_request('GET', f'{API_URL}/publication/{publication_id}')
+
+
+async def vote(client: AsyncClient, dataset: Dataset, rng: random.Random) -> Request:
+    user_id = rng.randint(1, dataset.users)
+    return client.build_request(
+        'PUT',
+        f'{API_URL}/vote',
+        json={'publication_id': rng.randint(1, dataset.publications), 'value': rng.choice((-1, 1))},
+        headers={'Authorization': f'Bearer {dataset.token(user_id)}'},
+    )
+
+
+async def login(client: AsyncClient, dataset: Dataset, rng: random.Random) -> Request:
+    return client.build_request(
+        'POST',
+        f'{API_URL}/auth/token',
+        data={'username': benchmark_username(rng.randint(1, dataset.users)), 'password': BENCHMARK_PASSWORD},
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    'top_publications': top_publications,
+    'publication_cache_hit': publication_cache_hit,
+    'publication_cache_miss': publication_cache_miss,
+    'vote': vote,
+    'login': login,
+}
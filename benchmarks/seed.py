@@ -0,0 +1,130 @@
+import asyncio
+import argparse
+from time import monotonic
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.postgres import engine
+from app.db.redis import get_redis
+from app.migrations.operations import SCHEMA, backfill_publication_counters, reset_sequence
+from app.models import meta
+from app.on_startup.leaderboard import start_leaderboard
+from app.on_startup.redis import start_redis
+from app.utils.auth.password import hash_password
+from conf.config import settings
+
+BENCHMARK_PASSWORD = 'benchmark'
+# Bounds are cast, generate_series is overloaded for integer, numeric and timestamp types
+SERIES = 'generate_series(CAST(:start AS integer), CAST(:end AS integer)) i'
+TABLES = f'"{SCHEMA}".votes, "{SCHEMA}".publication, "{SCHEMA}"."user"'
+
+
+def benchmark_username(user_id: int) -> str:
+    return f'benchmark_{user_id}'
+
+
+async def seed_users(connection: AsyncConnection, count: int, batch_size: int) -> None:
+    # One hash for everyone, hashing millions of passwords would dominate the seeding time
+    password = await hash_password(BENCHMARK_PASSWORD)
+    for start in range(1, count + 1, batch_size):
+        await connection.execute(
+            text(
+                f'INSERT INTO "{SCHEMA}"."user" (id, username, password) '
+                f"SELECT i, 'benchmark_' || i, :password FROM {SERIES}"
+            ),
+            {'password': password, 'start': start, 'end': min(start + batch_size, count + 1) - 1},
+        )
+
+
+async def seed_publications(connection: AsyncConnection, count: int, users: int, batch_size: int) -> None:
+    for start in range(1, count + 1, batch_size):
+        await connection.execute(
+            text(
+                f'INSERT INTO "{SCHEMA}".publication (id, text, author_id, publication_date) '
+                'SELECT i, repeat(md5(i::text), 1 + (random() * 8)::int), 1 + (random() * (:users - 1))::int, '
+                "now() - random() * interval '365 days' "
+                f'FROM {SERIES}'
+            ),
+            {'users': users, 'start': start, 'end': min(start + batch_size, count + 1) - 1},
+        )
+
+
+async def seed_votes(connection: AsyncConnection, count: int, users: int, publications: int, batch_size: int) -> None:
+    """
+    Every user votes for a contiguous run of publications starting at a user specific offset,
+    so (user_id, publication_id) pairs are unique without checking for conflicts.
+    """
+    votes_per_user = -(-count // users)
+    if votes_per_user > publications:
+        raise ValueError(f'{count} votes need at least {-(-count // publications)} users')
+
+    for start in range(0, count, batch_size):
+        await connection.execute(
+            text(
+                f'INSERT INTO "{SCHEMA}".votes (user_id, publication_id, value) '
+                'SELECT 1 + i / :per_user, 1 + ((i / :per_user) * 7919 + i % :per_user) % :publications, '
+                'CASE WHEN random() < 0.7 THEN 1 ELSE -1 END '
+                f'FROM {SERIES}'
+            ),
+            {
+                'per_user': votes_per_user,
+                'publications': publications,
+                'start': start,
+                'end': min(start + batch_size, count) - 1,
+            },
+        )
+
+
+async def drop_cache() -> None:
+    redis = get_redis()
+    async for key in redis.scan_iter(match=f'{settings.REDIS_CACHE_PREFIX}:*', count=1000):
+        await redis.unlink(key)
+
+
+async def main(users: int, publications: int, votes: int, seed: float, batch_size: int) -> None:
+    start_time = monotonic()
+    async with engine.begin() as connection:
+        await connection.run_sync(meta.metadata.create_all)
+        await connection.execute(text(f'TRUNCATE {TABLES} RESTART IDENTITY'))
+
+    async with engine.connect() as connection:
+        # random() is repeatable for the rest of the session
+        await connection.execute(text('SELECT setseed(:seed)'), {'seed': seed})
+        for name, seeder in (
+            ('users', seed_users(connection, users, batch_size)),
+            ('publications', seed_publications(connection, publications, users, batch_size)),
+            ('votes', seed_votes(connection, votes, users, publications, batch_size)),
+        ):
+            await seeder
+            await connection.commit()
+            logger.info('Seeded {name} in {time:.1f}s', name=name, time=monotonic() - start_time)
+
+        for table in ('user', 'publication', 'votes'):
+            await reset_sequence(connection, table)
+        await backfill_publication_counters(connection, settings.MIGRATION_BATCH_SIZE)
+        await connection.commit()
+
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+        await connection.execute(text(f'VACUUM ANALYZE {TABLES}'))
+
+    await start_redis()
+    await drop_cache()
+    await start_leaderboard(force=True)
+    logger.info('Dataset ready in {time:.1f}s', time=monotonic() - start_time)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Replaces all users, publications and votes with a generated benchmark dataset'
+    )
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--publications', type=int, default=100000)
+    parser.add_argument('--votes', type=int, default=1000000)
+    parser.add_argument('--seed', type=float, default=0.42, help='Postgres setseed value between -1 and 1')
+    parser.add_argument('--batch-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.users, args.publications, args.votes, args.seed, args.batch_size))
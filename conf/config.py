@@ -1,23 +1,85 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     BIND_IP: str
     BIND_PORT: int
+    # Production server settings, 0 workers means one per CPU
+    WEB_WORKERS: int = 0
+    WEB_MAX_REQUESTS: int = 10000
+    WEB_MAX_REQUESTS_JITTER: int = 1000
+    WEB_GRACEFUL_TIMEOUT: int = 30
     DB_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Disables asyncpg prepared statement cache, required behind pgbouncer in transaction pooling mode
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    SQL_METRICS_ENABLED: bool = True
+    # Requests executing more SQL statements are logged, 0 disables it
+    SQL_QUERY_BUDGET: int = 10
+    # JSON list of read replica urls used by read-only endpoints
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_SELECTION: Literal['round_robin', 'least_connections'] = 'round_robin'
+    # Seconds a replica is skipped after a connection error
+    DB_REPLICA_EJECT_TIME: float = 30
+    # Seconds a user reads from the primary after a write, 0 disables it
+    DB_READ_YOUR_WRITES_TIME: int = 0
+    MIGRATION_BATCH_SIZE: int = 10000
 
     SECRET_KEY: str
     ALGORITHM: str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASHING_WORKERS: int = 4
+    # Calls waiting for a free worker, more are rejected with 503
+    PASSWORD_HASHING_QUEUE_SIZE: int = 16
+    # Only used for tokens issued without the user id claim
+    PRINCIPAL_CACHE_MAX_ITEMS: int = 10000
+    PRINCIPAL_CACHE_MAX_BYTES: int = 1024 * 1024
+    PRINCIPAL_CACHE_EXPIRE_TIME: float = 30
 
     API_PREFIX: str = '/api'
     API_V1_PREFIX: str = '/v1'
 
+    PUBLICATIONS_PAGE_SIZE_MAX: int = 100
+    PUBLICATIONS_BATCH_SIZE_MAX: int = 100
+
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: str
     REDIS_CACHE_PREFIX: str = "publication"
     REDIS_EXPIRE_TIME: int = 60
+    # Cross-worker lock for cache misses, 0 disables it
+    REDIS_LOCK_TIMEOUT_MS: int = 0
+    REDIS_LOCK_POLL_INTERVAL_MS: int = 20
+
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_MAX_ITEMS: int = 10000
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LOCAL_CACHE_EXPIRE_TIME: float = 5
+    LOCAL_CACHE_INVALIDATION_CHANNEL: str = 'publication:invalidation'
+
+    PUBLICATIONS_PAGE_CACHE_ENABLED: bool = True
+    PUBLICATIONS_PAGE_EXPIRE_TIME: int = 30
+
+    LEADERBOARD_ENABLED: bool = True
+    LEADERBOARD_REBUILD_ON_STARTUP: bool = True
+    LEADERBOARD_REBUILD_BATCH_SIZE: int = 10000
+    LEADERBOARD_REBUILD_LOCK_TIMEOUT_MS: int = 600000
+
+    VOTE_BATCH_SIZE_MAX: int = 100
+
+    # Votes are acknowledged after being buffered in Redis and written to Postgres in batches
+    VOTE_WRITE_BEHIND_ENABLED: bool = False
+    VOTE_WRITE_BEHIND_FLUSH_INTERVAL: float = 1
+    VOTE_WRITE_BEHIND_BATCH_SIZE: int = 1000
+    VOTE_WRITE_BEHIND_LOCK_TIMEOUT_MS: int = 60000
 
 
 settings = Settings()
@@ -0,0 +1,29 @@
+import os
+import shutil
+from multiprocessing import cpu_count
+
+from prometheus_client import multiprocess
+
+from conf.config import settings
+
+bind = f'{settings.BIND_IP}:{settings.BIND_PORT}'
+workers = settings.WEB_WORKERS or cpu_count()
+# Uses uvloop and httptools when they are installed
+worker_class = 'uvicorn.workers.UvicornWorker'
+# Workers are restarted after a random number of requests in [max_requests, max_requests + jitter]
+max_requests = settings.WEB_MAX_REQUESTS
+max_requests_jitter = settings.WEB_MAX_REQUESTS_JITTER
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT
+
+
+def on_starting(server: object) -> None:
+    # Files left by a previous run would be added to the new metrics
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
+
+def child_exit(server: object, worker: object) -> None:
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[attr-defined]
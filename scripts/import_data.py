@@ -0,0 +1,52 @@
+import asyncio
+import argparse
+from pathlib import Path
+
+from app.cache.ranking import bump_ranking_generation
+from app.db.postgres import engine
+from app.migrations.importer import import_files
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
+from app.models.publication.vote import Vote
+from app.on_startup.leaderboard import start_leaderboard
+from app.on_startup.redis import start_redis
+
+
+async def main(
+    users: Path | None, publications: Path | None, votes: Path | None, batch_size: int, defer_indexes: bool
+) -> None:
+    paths = {
+        table: path
+        for table, path in ((User.__table__, users), (Publication.__table__, publications), (Vote.__table__, votes))
+        if path is not None
+    }
+    await import_files(engine, paths, batch_size, defer_indexes=defer_indexes)
+
+    await start_redis()
+    await start_leaderboard(force=True)
+    # Cached pages of top publications are stale, cached publications expire on their own
+    await bump_ranking_generation()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=(
+            'Imports users, publications and votes from CSV files with a header or NDJSON files with COPY. '
+            'Passwords must be bcrypt hashes'
+        )
+    )
+    parser.add_argument('--users', type=Path)
+    parser.add_argument('--publications', type=Path)
+    parser.add_argument('--votes', type=Path)
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rows kept in memory and sent per COPY')
+    parser.add_argument(
+        '--defer-indexes',
+        action='store_true',
+        help=(
+            'Drop indexes and foreign keys while copying and restore them at the end, several times faster. '
+            'Vote upserts fail meanwhile, never use it on a database that serves requests'
+        ),
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.users, args.publications, args.votes, args.batch_size, args.defer_indexes))
@@ -4,6 +4,7 @@ import logging
 from sqlalchemy.exc import IntegrityError
 
 from app.db.postgres import engine
+from app.migrations.runner import migrate
 from app.models import meta
 
 
@@ -14,6 +15,9 @@ async def main() -> None:
     except IntegrityError:
         logging.exception('Already exists')
 
+    # Brings tables created by older versions up to date
+    await migrate(engine)
+
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,13 @@
+import asyncio
+
+from app.on_startup.leaderboard import start_leaderboard
+from app.on_startup.redis import start_redis
+
+
+async def main() -> None:
+    await start_redis()
+    await start_leaderboard(force=True)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
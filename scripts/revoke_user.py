@@ -0,0 +1,22 @@
+import asyncio
+import argparse
+
+from app.cache.revoked_users import restore_user, revoke_user
+from app.on_startup.redis import start_redis
+
+
+async def main(user_id: int, restore: bool) -> None:
+    await start_redis()
+    if restore:
+        await restore_user(user_id)
+    else:
+        await revoke_user(user_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Revoke access tokens of a deleted or banned user')
+    parser.add_argument('user_id', type=int)
+    parser.add_argument('--restore', action='store_true', help='Allow the user to authenticate again')
+    args = parser.parse_args()
+
+    asyncio.run(main(args.user_id, args.restore))
@@ -1,8 +1,12 @@
 #!/usr/bin/env bash
 echo "Start service"
 
-# migrate database
+# migrate database once, before workers start
 python scripts/migrate.py
 
+if [[ "$WEB_RELOAD" == "true" ]]; then
+    exec uvicorn --factory app.main:create_app --host=$BIND_IP --port=$BIND_PORT --reload
+fi
 
-exec uvicorn --factory app.main:create_app --host=$BIND_IP --port=$BIND_PORT --reload
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+exec gunicorn 'app.main:create_app()' --config conf/gunicorn.py
@@ -1,5 +1,6 @@
 import json
 import datetime
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncGenerator, List
 
@@ -15,6 +16,7 @@ from tests.my_types import FixtureFunctionT
 
 from app.db import redis
 from app.db.postgres import engine, get_session
+from app.db.replicas import get_read_session_factory
 from app.models.meta import metadata
 
 
@@ -34,6 +36,7 @@ async def db_session(app: FastAPI) -> AsyncGenerator[AsyncSession, None]:
             yield session
 
         app.dependency_overrides[get_session] = mocked_session
+        app.dependency_overrides[get_read_session_factory] = lambda: asynccontextmanager(mocked_session)
 
         yield session
 
@@ -78,6 +81,7 @@ async def access_token(
 
 @pytest.fixture()
 def _mock_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    TestRedisClient.flush()
     redis.redis = TestRedisClient()
 
 
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from loguru import logger
+from prometheus_client import REGISTRY
+from starlette import status
+
+from tests.const import URLS
+
+from conf.config import settings
+
+FIXTURES_PATH = Path(__file__).parent / 'v1' / 'auth' / 'user' / 'fixtures'
+
+
+def requests_count(endpoint: str, http_status: int) -> float:
+    labels = {'method': 'GET', 'endpoint': endpoint, 'http_status': str(http_status)}
+    return REGISTRY.get_sample_value('http_requests_total', labels) or 0
+
+
+@pytest.mark.parametrize('fixtures', [[]])
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_metrics_use_route_template(client: AsyncClient, db_session: None) -> None:
+    endpoint = URLS['api']['v1']['publication']['publication'] + '/{publication_id}'
+    before = requests_count(endpoint, status.HTTP_404_NOT_FOUND)
+    unmatched_before = requests_count('<unmatched>', status.HTTP_404_NOT_FOUND)
+
+    for publication_id in (2132131, 2132132):
+        response = await client.get(URLS['api']['v1']['publication']['publication'] + f'/{publication_id}')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.get('/unknown')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    assert requests_count(endpoint, status.HTTP_404_NOT_FOUND) == before + 2
+    assert requests_count('<unmatched>', status.HTTP_404_NOT_FOUND) == unmatched_before + 1
+    assert REGISTRY.get_sample_value('http_requests_in_progress', {'method': 'GET'}) == 0
+    assert REGISTRY.get_sample_value('http_response_size_bytes_count', {'method': 'GET', 'endpoint': endpoint}) >= 2
+
+
+@pytest.mark.parametrize(
+    'fixtures',
+    [
+        [
+            FIXTURES_PATH / 'publication.user.json',
+            FIXTURES_PATH / 'publication.publication.json',
+        ],
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_metrics_sql_query_budget(
+    client: AsyncClient,
+    db_session: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, 'SQL_QUERY_BUDGET', 1)
+    endpoint = URLS['api']['v1']['auth']['user']
+    labels = {'method': 'GET', 'endpoint': endpoint}
+    before = REGISTRY.get_sample_value('publication_sql_queries_per_request_sum', labels) or 0
+    warnings: list[str] = []
+    handler_id = logger.add(warnings.append, level='WARNING', format='{message}')
+
+    try:
+        response = await client.get(endpoint.format(user_id=0))
+    finally:
+        logger.remove(handler_id)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert REGISTRY.get_sample_value('publication_sql_queries_per_request_sum', labels) == before + 2
+    assert warnings == [f'GET {endpoint} executed 2 SQL statements, the budget is 1\n']
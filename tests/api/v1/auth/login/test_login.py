@@ -2,10 +2,17 @@ from pathlib import Path
 
 import pytest
 from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from tests.const import URLS
 
+from app.cache.revoked_users import revoke_user
+from app.crud.user import get_user_by_username
+from app.utils.auth import password as password_module
+from conf.config import settings
+
 BASE_DIR = Path(__file__).parent
 FIXTURES_PATH = BASE_DIR / 'fixtures'
 
@@ -51,3 +58,101 @@ async def test_login(
         headers=headers,
     )
     assert response.status_code == expected_status
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            [
+                FIXTURES_PATH / 'publication.user.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_revoked_user(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    access_token: str,
+    db_session: None,
+) -> None:
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    response = await client.get(URLS['api']['v1']['auth']['me'], headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {'id': 0, 'username': username}
+
+    await revoke_user(0)
+
+    response = await client.get(URLS['api']['v1']['auth']['me'], headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            [
+                FIXTURES_PATH / 'publication.user.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_login_rehashes_password(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        password_module,
+        'pwd_context',
+        CryptContext(schemes=['bcrypt'], bcrypt__default_rounds=4, bcrypt__min_rounds=4, bcrypt__max_rounds=4),
+    )
+
+    for _ in range(2):
+        response = await client.post(
+            URLS['api']['v1']['auth']['token'], data={'username': username, 'password': password}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        user = await get_user_by_username(db_session, username)
+        assert user.password.startswith('$2b$04$')
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            [
+                FIXTURES_PATH / 'publication.user.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_login_hashing_pool_busy(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    db_session: None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, 'PASSWORD_HASHING_QUEUE_SIZE', -settings.PASSWORD_HASHING_WORKERS)
+
+    response = await client.post(URLS['api']['v1']['auth']['token'], data={'username': username, 'password': password})
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from tests.const import URLS
+
+BASE_DIR = Path(__file__).parent
+FIXTURES_PATH = BASE_DIR / 'fixtures'
+
+
+@pytest.mark.parametrize(
+    ('user_id', 'params', 'expected_status', 'expected_publications', 'fixtures'),
+    [
+        (
+            0,
+            {},
+            status.HTTP_200_OK,
+            [0],
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+        (
+            0,
+            {'skip': 1},
+            status.HTTP_200_OK,
+            [],
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+        (
+            1,
+            {},
+            status.HTTP_404_NOT_FOUND,
+            None,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture')
+async def test_read_author(
+    client: AsyncClient,
+    user_id: int,
+    params: dict[str, int],
+    expected_status: int,
+    expected_publications: list[int] | None,
+    db_session: None,
+) -> None:
+    response = await client.get(URLS['api']['v1']['auth']['user'].format(user_id=user_id), params=params)
+    assert response.status_code == expected_status
+
+    if expected_publications is not None:
+        assert [publication['id'] for publication in response.json()['publications']] == expected_publications
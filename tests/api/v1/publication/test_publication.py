@@ -2,10 +2,14 @@ from pathlib import Path
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from tests.const import URLS
 
+from app.cache.leaderboard import rebuild_leaderboard
+from app.crud.publication import stream_publication_ratings
 from app.crud.vote import get_vote_by_user_and_publication_id
 from app.models.publication.publication import Publication
 
@@ -261,3 +265,186 @@ async def test_publication_vote(
 
     assert vote is not None
     assert vote.value == -1
+
+    response = await client.put(
+        URLS['api']['v1']['publication']['vote'].format(publication_id=publication_id),
+        headers=headers,
+        json={'value': 1},
+    )
+    assert response.status_code == expected_status
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 1
+    assert publication.likes == 1
+    assert publication.dislikes == 0
+
+    response = await client.get(f"{URLS['api']['v1']['publication']['publication']}/{publication_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['rating'] == 1
+    assert response.json()['votes'] == [{'value': 1, 'publication_id': publication_id}]
+
+    cached_response = await client.get(f"{URLS['api']['v1']['publication']['publication']}/{publication_id}")
+    assert cached_response.headers['content-type'] == 'application/json'
+    assert cached_response.content == response.content
+
+
+@pytest.mark.parametrize(
+    'fixtures',
+    [
+        [
+            FIXTURES_PATH / 'publication.user.json',
+            FIXTURES_PATH / 'publication.publication.json',
+        ],
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_get_publications_with_cursor(
+    client: AsyncClient,
+    db_session: None,
+) -> None:
+    response = await client.get(URLS['api']['v1']['publication']['publication'], params={'limit': 1})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+    cursor = response.headers['X-Next-Cursor']
+    response = await client.get(
+        URLS['api']['v1']['publication']['publication'], params={'limit': 1, 'cursor': cursor}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+    assert 'X-Next-Cursor' not in response.headers
+
+    response = await client.get(URLS['api']['v1']['publication']['publication'], params={'cursor': 'invalid'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await client.get(URLS['api']['v1']['publication']['publication'], params={'limit': 1000})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_get_publications_from_leaderboard(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+) -> None:
+    headers = {'Authorization': f'Bearer {access_token}'}
+    assert await rebuild_leaderboard(stream_publication_ratings(db_session, 100)) == 1
+
+    response = await client.put(
+        URLS['api']['v1']['publication']['vote'].format(publication_id=publication_id),
+        headers=headers,
+        json={'value': 1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(URLS['api']['v1']['publication']['publication'])
+    assert response.status_code == status.HTTP_200_OK
+    assert [(publication['id'], publication['rating']) for publication in response.json()] == [(publication_id, 1)]
+
+    await db_session.execute(update(Publication).values(text='not from cache', rating=100))
+    response = await client.get(URLS['api']['v1']['publication']['publication'])
+    assert response.json()[0]['text'] == 'HighLoad2'
+    assert response.json()[0]['rating'] == 1
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_get_publications_page_cache(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+) -> None:
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    response = await client.get(URLS['api']['v1']['publication']['publication'])
+    assert response.json()[0]['text'] == 'HighLoad2'
+    # A cursor equal to a cached offset is still decoded
+    response = await client.get(URLS['api']['v1']['publication']['publication'], params={'cursor': '0'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    await db_session.execute(update(Publication).values(text='new text'))
+    response = await client.get(URLS['api']['v1']['publication']['publication'])
+    assert response.json()[0]['text'] == 'HighLoad2'
+
+    response = await client.put(
+        URLS['api']['v1']['publication']['vote'].format(publication_id=publication_id),
+        headers=headers,
+        json={'value': 1},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(URLS['api']['v1']['publication']['publication'])
+    assert response.json()[0]['text'] == 'new text'
+    assert response.json()[0]['rating'] == 1
+
+
+@pytest.mark.parametrize(
+    'fixtures',
+    [
+        [
+            FIXTURES_PATH / 'publication.user.json',
+            FIXTURES_PATH / 'publication.publication.json',
+        ],
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_get_publications_batch(
+    client: AsyncClient,
+    db_session: AsyncSession,
+) -> None:
+    response = await client.get(URLS['api']['v1']['publication']['batch'], params={'ids': [2132131, 0, 0]})
+    assert response.status_code == status.HTTP_200_OK
+    assert [publication and publication['text'] for publication in response.json()['items']] == [
+        None,
+        'HighLoad2',
+        'HighLoad2',
+    ]
+    assert response.json()['not_found'] == [2132131]
+
+    await db_session.execute(update(Publication).values(text='not from cache'))
+    response = await client.get(URLS['api']['v1']['publication']['batch'], params={'ids': [0]})
+    assert response.json()['items'][0]['text'] == 'HighLoad2'
+
+    response = await client.get(URLS['api']['v1']['publication']['batch'], params={'ids': list(range(1000))})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await client.get(URLS['api']['v1']['publication']['batch'])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
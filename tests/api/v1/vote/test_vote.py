@@ -1,12 +1,25 @@
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from pathlib import Path
+from typing import AsyncIterator
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from tests.const import URLS
+from tests.mocking.redis import TestRedisClient
 
+from app.cache.key_builder import get_leaderboard_name
+from app.cache.leaderboard import MEMBER_WIDTH
+from app.cache.vote_buffer import buffer_vote, take_buffered_votes
 from app.crud.vote import get_vote_by_user_and_publication_id
+from app.models.publication.publication import Publication
+from app.on_startup import vote_buffer
+from app.on_startup.vote_buffer import flush_vote_buffer
+from app.utils.auth.jwt import create_access_token
+from conf.config import settings
 
 BASE_DIR = Path(__file__).parent
 
@@ -54,6 +67,11 @@ async def test_vote_create_and_delete(
     assert vote is not None
     assert vote.value == -1
 
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == -1
+    assert publication.dislikes == 1
+
     response = await client.delete(
         URLS['api']['v1']['vote']['vote'],
         headers=headers,
@@ -64,3 +82,279 @@ async def test_vote_create_and_delete(
     vote = await get_vote_by_user_and_publication_id(db_session, publication_id, 0)
 
     assert vote is None
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 0
+    assert publication.dislikes == 0
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_twice(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+) -> None:
+    headers = {'Authorization': f'Bearer {access_token}'}
+    responses = [
+        await client.put(
+            URLS['api']['v1']['vote']['vote'],
+            headers=headers,
+            json={'value': 1, 'publication_id': publication_id},
+        )
+        for _ in range(2)
+    ]
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 2
+    assert responses[0].json() == responses[1].json()
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 1
+    assert publication.likes == 1
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            [
+                FIXTURES_PATH / 'publication.user.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_for_wrong_publication(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    access_token: str,
+    db_session: None,
+) -> None:
+    response = await client.put(
+        URLS['api']['v1']['vote']['vote'],
+        headers={'Authorization': f'Bearer {access_token}'},
+        json={'value': 1, 'publication_id': 2132131},
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    ('publication_id', 'fixtures'),
+    [
+        (
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_of_deleted_user(client: AsyncClient, publication_id: int, db_session: None) -> None:
+    access_token = create_access_token({'sub': 'deleted_user', 'uid': 2132131}, timedelta(minutes=5))
+    response = await client.put(
+        URLS['api']['v1']['vote']['batch'],
+        headers={'Authorization': f'Bearer {access_token}'},
+        json=[{'value': 1, 'publication_id': publication_id}, {'value': 1, 'publication_id': 2132131}],
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.put(
+        URLS['api']['v1']['vote']['vote'],
+        headers={'Authorization': f'Bearer {access_token}'},
+        json={'value': 1, 'publication_id': publication_id},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_write_behind(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, 'VOTE_WRITE_BEHIND_ENABLED', True)
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        yield db_session
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    for vote in [
+        {'value': -1, 'publication_id': publication_id},
+        {'value': 1, 'publication_id': publication_id},
+        {'value': 1, 'publication_id': 2132131},
+    ]:
+        response = await client.put(URLS['api']['v1']['vote']['vote'], headers=headers, json=vote)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+    assert await get_vote_by_user_and_publication_id(db_session, publication_id, 0) is None
+
+    assert await flush_vote_buffer(session_factory) == 2
+    assert await flush_vote_buffer(session_factory) == 0
+
+    vote = await get_vote_by_user_and_publication_id(db_session, publication_id, 0)
+
+    assert vote is not None
+    assert vote.value == 1
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 1
+    assert publication.likes == 1
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_write_behind_deleted_during_flush(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, 'VOTE_WRITE_BEHIND_ENABLED', True)
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncIterator[AsyncSession]:
+        yield db_session
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    async def take_and_delete() -> tuple[list[dict[str, int]], bool]:
+        taken = await take_buffered_votes()
+        response = await client.delete(
+            URLS['api']['v1']['vote']['vote'], headers=headers, params={'publication_id': publication_id}
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        return taken
+
+    monkeypatch.setattr(vote_buffer, 'take_buffered_votes', take_and_delete)
+
+    response = await client.put(
+        URLS['api']['v1']['vote']['vote'], headers=headers, json={'value': 1, 'publication_id': publication_id}
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    # A vote of a deleted user
+    await buffer_vote(2132131, publication_id, -1)
+
+    assert await flush_vote_buffer(session_factory) == 2
+    monkeypatch.setattr(vote_buffer, 'take_buffered_votes', take_buffered_votes)
+    assert await flush_vote_buffer(session_factory) == 0
+
+    assert await get_vote_by_user_and_publication_id(db_session, publication_id, 0) is None
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 0
+    assert publication.likes == 0
+    assert TestRedisClient.sorted_sets[get_leaderboard_name()] == {str(publication_id).zfill(MEMBER_WIDTH): 0}
+
+
+@pytest.mark.parametrize(
+    ('username', 'password', 'publication_id', 'fixtures'),
+    [
+        (
+            'test_client',
+            'secret',
+            0,
+            [
+                FIXTURES_PATH / 'publication.user.json',
+                FIXTURES_PATH / 'publication.publication.json',
+            ],
+        ),
+    ],
+)
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_common_api_fixture_with_redis')
+async def test_vote_batch(
+    client: AsyncClient,
+    username: str,
+    password: str,
+    publication_id: int,
+    access_token: str,
+    db_session: AsyncSession,
+) -> None:
+    headers = {'Authorization': f'Bearer {access_token}'}
+    votes = [
+        {'value': -1, 'publication_id': publication_id},
+        {'value': 1, 'publication_id': 2132131},
+        {'value': 1, 'publication_id': publication_id},
+    ]
+
+    response = await client.put(URLS['api']['v1']['vote']['batch'], headers=headers, json=votes)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {'value': 1, 'publication_id': publication_id, 'status': 'changed'},
+        {'value': 1, 'publication_id': 2132131, 'status': 'not_found'},
+    ]
+
+    response = await client.put(URLS['api']['v1']['vote']['batch'], headers=headers, json=votes)
+    assert [vote['status'] for vote in response.json()] == ['unchanged', 'not_found']
+
+    publication = await db_session.get(Publication, publication_id, populate_existing=True)
+
+    assert publication.rating == 1
+    assert publication.likes == 1
+
+    response = await client.put(URLS['api']['v1']['vote']['batch'], headers=headers, json=[])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.report import compare, summarize
+
+
+def test_summarize_reports_percentiles_in_milliseconds() -> None:
+    latencies = [index / 1000 for index in range(1, 101)]
+
+    result = summarize(latencies, {200: 99, 503: 1}, duration=2)
+
+    assert result['requests'] == 100
+    assert result['errors'] == 1
+    assert result['throughput_rps'] == 50
+    assert result['latency_ms']['p50'] == pytest.approx(50.5)
+    assert result['latency_ms']['p99'] == pytest.approx(99.01)
+    assert result['latency_ms']['max'] == pytest.approx(100)
+
+
+def test_compare_reports_improvements_as_positive() -> None:
+    def report(throughput: float, latency: float) -> dict:
+        return {
+            'scenarios': {
+                'vote': {'throughput_rps': throughput, 'latency_ms': {'p50': latency, 'p95': latency, 'p99': latency}}
+            }
+        }
+
+    changes = compare(report(100, 20), report(150, 10))
+
+    assert changes == {'vote': {'throughput_rps': 50, 'p50': 50, 'p95': 50, 'p99': 50}}
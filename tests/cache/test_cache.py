@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+
+from tests.mocking.redis import TestRedisClient
+
+from app.cache.cache import (
+    redis_drop_key,
+    redis_drop_many,
+    redis_get,
+    redis_get_many,
+    redis_get_many_raw,
+    redis_get_or_load,
+    redis_set,
+    redis_set_many,
+)
+from app.cache.key_builder import get_cache_name
+from app.db import redis
+from conf.config import settings
+
+
+@pytest.fixture()
+def _mock_redis() -> None:
+    TestRedisClient.flush()
+    redis.redis = TestRedisClient()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_redis_get_or_load_single_flight() -> None:
+    calls = 0
+
+    async def loader() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b'{"id":1}'
+
+    results = await asyncio.gather(*[redis_get_or_load('Model', 1, loader) for _ in range(10)])
+
+    assert results == [b'{"id":1}'] * 10
+    assert calls == 1
+    assert await redis_get('Model', 1) == {'id': 1}
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_redis_get_or_load_error_is_shared() -> None:
+    calls = 0
+
+    async def loader() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise LookupError()
+
+    results = await asyncio.gather(*[redis_get_or_load('Model', 1, loader) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(result, LookupError) for result in results)
+    assert calls == 1
+    assert await redis_get('Model', 1) == {}
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_redis_get_or_load_waits_for_other_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'REDIS_LOCK_TIMEOUT_MS', 1000)
+    await redis.redis.set(get_cache_name('Model', 1) + ':lock', 1)
+
+    async def other_worker() -> None:
+        await asyncio.sleep(0.05)
+        await redis_set('Model', 1, {'id': 1})
+
+    async def loader() -> bytes:
+        raise AssertionError('Key is loaded by another worker')
+
+    result, _ = await asyncio.gather(redis_get_or_load('Model', 1, loader), other_worker())
+
+    assert result == b'{"id":1}'
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_redis_get_or_load_keeps_lock_of_other_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'REDIS_LOCK_TIMEOUT_MS', 50)
+    lock_key = get_cache_name('Model', 1) + ':lock'
+    await redis.redis.set(lock_key, 'other_worker')
+
+    async def loader() -> bytes:
+        return b'{"id":1}'
+
+    assert await redis_get_or_load('Model', 1, loader) == b'{"id":1}'
+    assert await redis.redis.get(lock_key) == 'other_worker'
+
+    await redis_drop_key('Model', 1)
+    await redis.redis.delete(lock_key)
+    assert await redis_get_or_load('Model', 1, loader) == b'{"id":1}'
+    assert await redis.redis.get(lock_key) is None
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_redis_get_or_load_survives_cancelled_first_waiter() -> None:
+    started = asyncio.Event()
+    release = asyncio.Event()
+    session_closed_early = False
+
+    @asynccontextmanager
+    async def session_factory() -> AsyncIterator[None]:
+        nonlocal session_closed_early
+        try:
+            yield
+        finally:
+            session_closed_early = not release.is_set()
+
+    async def loader() -> bytes:
+        async with session_factory():
+            started.set()
+            await release.wait()
+            return b'{"id":1}'
+
+    first = asyncio.create_task(redis_get_or_load('Model', 1, loader))
+    await started.wait()
+    second = asyncio.create_task(redis_get_or_load('Model', 1, loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == b'{"id":1}'
+    assert first.cancelled()
+    assert not session_closed_early
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+@pytest.mark.parametrize('local_cache_enabled', [False, True])
+async def test_redis_many(monkeypatch: pytest.MonkeyPatch, local_cache_enabled: bool) -> None:
+    monkeypatch.setattr(settings, 'LOCAL_CACHE_ENABLED', local_cache_enabled)
+
+    await redis_set_many('Model', {1: {'id': 1}, 2: {'id': 2}})
+    assert await redis_get_many('Model', [3, 2, 1]) == {2: {'id': 2}, 1: {'id': 1}}
+
+    await redis_drop_many('Model', [1, 3])
+    assert await redis_get_many('Model', [1, 2]) == {2: {'id': 2}}
+    assert await redis_get_many_raw('Model', [1, 2]) == {2: b'{"id":2}'}
@@ -0,0 +1,66 @@
+import pytest
+
+from tests.mocking.redis import TestRedisClient, TestRedisPipeline
+
+from app.cache.cache import redis_get, redis_set
+from app.cache.invalidation import (
+    publication_created,
+    publication_deleted,
+    publication_voted,
+    publications_rescored,
+    publications_voted,
+)
+from app.cache.key_builder import get_leaderboard_name
+from app.cache.leaderboard import MEMBER_WIDTH
+from app.cache.ranking import get_ranking_generation
+from app.db import redis
+from app.schema.publication.publication import Publication
+from conf.config import settings
+
+
+@pytest.fixture()
+def _mock_redis() -> None:
+    TestRedisClient.flush()
+    redis.redis = TestRedisClient()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_publications_voted_in_one_pipeline(monkeypatch: pytest.MonkeyPatch) -> None:
+    await redis_set(Publication.__name__, 1, {'id': 1})
+    executed = []
+
+    async def execute(pipe: TestRedisPipeline) -> list[object]:
+        executed.append(len(pipe.commands))
+        return [await command for command in pipe.commands]
+
+    monkeypatch.setattr(TestRedisPipeline, 'execute', execute)
+
+    await publications_voted({1: 2, 2: -1, 3: 0})
+    await publications_rescored({1: 5})
+
+    assert len(executed) == 2
+    assert TestRedisClient.sorted_sets[get_leaderboard_name()] == {
+        '1'.zfill(MEMBER_WIDTH): 5,
+        '2'.zfill(MEMBER_WIDTH): -1,
+    }
+    assert await redis_get(Publication.__name__, 1) == {}
+    assert await get_ranking_generation() == 2
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_disabled_features_are_not_maintained(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'LEADERBOARD_ENABLED', False)
+    monkeypatch.setattr(settings, 'PUBLICATIONS_PAGE_CACHE_ENABLED', False)
+    await redis_set(Publication.__name__, 1, {'id': 1})
+
+    await publication_created(2)
+    await publication_voted(1, 1)
+    await publications_voted({1: 1})
+    await publications_rescored({1: 5})
+    await publication_deleted(2)
+
+    assert TestRedisClient.sorted_sets == {}
+    assert await get_ranking_generation() == 0
+    assert await redis_get(Publication.__name__, 1) == {}
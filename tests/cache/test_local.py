@@ -0,0 +1,64 @@
+import pytest
+
+from tests.mocking.redis import TestRedisClient
+
+from app.cache.cache import redis_drop_key, redis_get, redis_get_raw, redis_set
+from app.cache.local import LocalCache, local_cache
+from app.db import redis
+from conf.config import settings
+
+
+@pytest.fixture()
+def _local_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'LOCAL_CACHE_ENABLED', True)
+    local_cache.clear()
+    TestRedisClient.flush()
+    redis.redis = TestRedisClient()
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    cache = LocalCache(max_items=2, max_bytes=100, expire_time=60)
+    cache.set('a', 1, 10)
+    cache.set('b', 2, 10)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3, 10)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_local_cache_respects_memory_limit() -> None:
+    cache = LocalCache(max_items=10, max_bytes=25, expire_time=60)
+    cache.set('a', 1, 10)
+    cache.set('b', 2, 10)
+    cache.set('c', 3, 10)
+    cache.set('huge', 4, 30)
+
+    assert cache.get('a') is None
+    assert cache.get('huge') is None
+    assert len(cache) == 2
+    assert cache.size == 20
+
+
+def test_local_cache_expires() -> None:
+    cache = LocalCache(max_items=10, max_bytes=100, expire_time=-1)
+    cache.set('a', 1, 10)
+
+    assert cache.get('a') is None
+    assert cache.size == 0
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_local_cache')
+async def test_redis_get_uses_local_cache() -> None:
+    await redis_set('Model', 1, {'id': 1})
+    TestRedisClient.flush()
+
+    assert await redis_get('Model', 1) == {'id': 1}
+    assert await redis_get_raw('Model', 1) == b'{"id":1}'
+
+    await redis_drop_key('Model', 1)
+
+    assert await redis_get('Model', 1) == {}
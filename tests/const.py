@@ -8,12 +8,15 @@ URLS = {
             'auth': {
                 'registration': API_PREFIX + '/auth/registration',
                 'token': API_PREFIX + '/auth/token',
+                'me': API_PREFIX + '/auth/users/me',
+                'user': API_PREFIX + '/auth/users/{user_id}',
             },
             'publication': {
                 'publication': API_PREFIX + '/publication',
+                'batch': API_PREFIX + '/publication/batch',
                 'vote': API_PREFIX + '/publication/{publication_id}/vote',
             },
-            'vote': {'vote': API_PREFIX + '/vote'},
+            'vote': {'vote': API_PREFIX + '/vote', 'batch': API_PREFIX + '/vote/batch'},
         },
     },
 }
@@ -0,0 +1,11 @@
+from app.db.instrumentation import statement_fingerprint
+
+
+def test_statement_fingerprint() -> None:
+    assert statement_fingerprint(
+        "SELECT id FROM votes\n  WHERE id IN ($1::INTEGER, $2::INTEGER) AND value = 1 AND name = 'it''s'"
+    ) == 'SELECT id FROM votes WHERE id IN (?) AND value = ? AND name = ?'
+    assert statement_fingerprint('INSERT INTO votes (user_id, value) VALUES ($1, $2), ($3, $4)') == (
+        'INSERT INTO votes (user_id, value) VALUES (?)'
+    )
+    assert statement_fingerprint('SELECT anon_1.id FROM ix_votes_1') == 'SELECT anon_1.id FROM ix_votes_1'
@@ -0,0 +1,19 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+
+from app.db.postgres import create_engine
+
+
+@pytest.mark.asyncio()
+async def test_pool_metrics() -> None:
+    engine = create_engine(name='test_pool')
+
+    async with engine.connect() as connection:
+        await connection.execute(text('SELECT 1'))
+        assert REGISTRY.get_sample_value('publication_db_pool_checked_out', {'pool': 'test_pool'}) == 1
+
+    assert REGISTRY.get_sample_value('publication_db_pool_checked_out', {'pool': 'test_pool'}) == 0
+    assert REGISTRY.get_sample_value('publication_db_pool_checkout_wait_seconds_count', {'pool': 'test_pool'}) == 1
+
+    await engine.dispose()
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from tests.mocking.redis import TestRedisClient
+
+from app.cache.primary_pin import pin_user_to_primary
+from app.db import redis, replicas
+from app.db.postgres import async_session, create_engine
+from app.db.replicas import ReplicaSet, get_read_session
+from app.utils.auth.jwt import create_access_token
+from conf.config import settings
+
+
+@pytest.fixture()
+def _mock_redis() -> None:
+    TestRedisClient.flush()
+    redis.redis = TestRedisClient()
+
+
+def test_replica_set_round_robin_and_eject() -> None:
+    engines = [create_engine(name='replica_a'), create_engine(name='replica_b')]
+    replica_set = ReplicaSet(engines, selection='round_robin', eject_time=60)
+
+    assert {replica_set.choose(), replica_set.choose()} == set(engines)
+
+    replica_set.eject(engines[0])
+    assert [replica_set.choose() for _ in range(3)] == [engines[1]] * 3
+
+    replica_set.eject(engines[1])
+    assert replica_set.choose() is None
+
+
+def test_replica_set_least_connections() -> None:
+    engines = [create_engine(name='replica_a'), create_engine(name='replica_b')]
+    replica_set = ReplicaSet(engines, selection='least_connections', eject_time=60)
+
+    assert replica_set.choose() is engines[0]
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('_mock_redis')
+async def test_get_read_session(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, 'DB_READ_YOUR_WRITES_TIME', 5)
+    replica = create_engine(name='replica_a')
+    monkeypatch.setattr(replicas, 'replica_set', ReplicaSet([replica], selection='round_robin', eject_time=60))
+    monkeypatch.setitem(replicas.replica_sessions, replica, async_session)
+    token = create_access_token({'sub': 'test_client', 'uid': 0}, timedelta(minutes=1))
+
+    async with async_session() as primary_session:
+        sessions = get_read_session(primary_session, token)
+        assert await sessions.__anext__() is not primary_session
+        await sessions.aclose()
+
+        await pin_user_to_primary(0)
+        sessions = get_read_session(primary_session, token)
+        assert await sessions.__anext__() is primary_session
+        await sessions.aclose()
+
+        sessions = get_read_session(primary_session, None)
+        await sessions.__anext__()
+        with pytest.raises(OperationalError):
+            await sessions.athrow(OperationalError('SELECT 1', {}, OSError()))
+        assert replicas.replica_set.choose() is None
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+
+from app.db.postgres import engine
+from app.migrations import importer
+from app.migrations.importer import import_files
+from app.migrations.operations import SCHEMA
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
+from app.models.publication.vote import Vote
+
+
+@pytest.fixture()
+async def _cleanup_imported() -> None:
+    yield
+
+    async with engine.begin() as connection:
+        await connection.execute(delete(Vote).where(Vote.user_id >= 300))
+        await connection.execute(delete(Publication).where(Publication.id >= 300))
+        await connection.execute(delete(User).where(User.id >= 300))
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app', '_cleanup_imported')
+async def test_import_files(tmp_path: Path) -> None:
+    users = tmp_path / 'users.csv'
+    users.write_text('id,username,password,legacy_field\n300,imported_1,hash,x\n301,imported_2,hash,y\n')
+    publications = tmp_path / 'publications.ndjson'
+    publications.write_text(
+        '\n'.join(
+            json.dumps(publication)
+            for publication in (
+                {'id': 300, 'text': 'first', 'author_id': 300, 'publication_date': '2023-01-01T10:00:00+03:00'},
+                {'id': 301, 'text': 'second', 'author_id': 301, 'publication_date': '2023-01-02T10:00:00Z'},
+            )
+        )
+    )
+    votes = tmp_path / 'votes.csv'
+    votes.write_text('user_id,publication_id,value\n300,300,1\n301,300,1\n300,301,1\n300,300,-1\n')
+
+    counts = await import_files(
+        engine,
+        {User.__table__: users, Publication.__table__: publications, Vote.__table__: votes},
+        batch_size=2,
+        defer_indexes=True,
+    )
+
+    assert counts == {'user': 2, 'publication': 2, 'votes': 4}
+    async with engine.begin() as connection:
+        res = await connection.execute(
+            select(Publication.id, Publication.rating, Publication.likes, Publication.dislikes)
+            .where(Publication.id >= 300)
+            .order_by(Publication.id)
+        )
+        # The latest of duplicated votes wins
+        assert [tuple(row) for row in res] == [(300, 0, 1, 1), (301, 1, 1, 0)]
+        indexes = await connection.scalars(
+            text('SELECT indexname FROM pg_indexes WHERE schemaname = :schema AND tablename = :table'),
+            {'schema': SCHEMA, 'table': 'votes'},
+        )
+        assert {index.name for index in Vote.__table__.indexes} <= set(indexes)
+        # Sequences continue after imported ids
+        await connection.execute(insert(User).values(username='imported_3', password=''))
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app', '_cleanup_imported')
+async def test_import_rejects_empty_publication_date(tmp_path: Path) -> None:
+    users = tmp_path / 'users.csv'
+    users.write_text('id,username,password\n300,imported_1,hash\n')
+    publications = tmp_path / 'publications.csv'
+    publications.write_text('id,text,author_id,publication_date\n300,first,300,2023-01-01T10:00:00\n301,second,300,\n')
+
+    with pytest.raises(ValueError, match='publications.csv:3'):
+        await import_files(engine, {User.__table__: users, Publication.__table__: publications}, batch_size=10)
+
+    async with engine.connect() as connection:
+        assert await connection.scalar(select(Publication.id).where(Publication.id >= 300)) is None
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app', '_cleanup_imported')
+async def test_import_restores_foreign_keys_when_an_index_fails(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def keep_duplicated_votes(*args: Any) -> int:
+        return 0
+
+    monkeypatch.setattr(importer, 'delete_duplicated_votes', keep_duplicated_votes)
+    users = tmp_path / 'users.csv'
+    users.write_text('id,username,password\n300,imported_1,hash\n')
+    publications = tmp_path / 'publications.csv'
+    publications.write_text('id,text,author_id\n300,first,300\n')
+    votes = tmp_path / 'votes.csv'
+    votes.write_text('user_id,publication_id,value\n300,300,1\n300,300,-1\n')
+
+    with pytest.raises(RuntimeError, match='ix_votes_user_id_publication_id'):
+        await import_files(
+            engine,
+            {User.__table__: users, Publication.__table__: publications, Vote.__table__: votes},
+            batch_size=10,
+            defer_indexes=True,
+        )
+
+    async with engine.begin() as connection:
+        foreign_keys = await connection.scalars(
+            text(
+                "SELECT conname FROM pg_constraint WHERE connamespace = CAST(:schema AS regnamespace) AND contype = 'f'"
+            ),
+            {'schema': SCHEMA},
+        )
+        assert set(foreign_keys) == {'votes_user_id_fkey', 'votes_publication_id_fkey', 'publication_author_id_fkey'}
+
+        await connection.execute(delete(Vote).where(Vote.user_id >= 300))
+        for index in Vote.__table__.indexes:
+            await connection.run_sync(index.create, checkfirst=True)
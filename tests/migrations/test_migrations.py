@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from app.db.postgres import engine
+from app.migrations.operations import backfill_publication_counters
+from app.migrations.runner import MIGRATIONS, migrate, schema_migrations
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
+from app.models.publication.vote import Vote
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app')
+async def test_migrate_is_idempotent() -> None:
+    await migrate(engine)
+
+    assert await migrate(engine) == []
+    async with engine.connect() as connection:
+        versions = await connection.scalars(select(schema_migrations.c.version))
+        assert set(versions) == {migration.VERSION for migration in MIGRATIONS}
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app')
+async def test_backfill_publication_counters() -> None:
+    async with engine.begin() as connection:
+        await connection.execute(insert(User).values(id=100, username='backfill', password=''))
+        await connection.execute(
+            insert(Publication).values(
+                [{'id': id, 'text': '', 'author_id': 100, 'rating': 10, 'likes': 10} for id in (100, 101, 102)]
+            )
+        )
+        await connection.execute(
+            insert(Vote).values(
+                [
+                    {'user_id': 100, 'publication_id': 100, 'value': 1},
+                    {'user_id': 100, 'publication_id': 101, 'value': -1},
+                ]
+            )
+        )
+
+        await backfill_publication_counters(connection, batch_size=2)
+
+        res = await connection.execute(
+            select(Publication.id, Publication.rating, Publication.likes, Publication.dislikes)
+            .where(Publication.author_id == 100)
+            .order_by(Publication.id)
+        )
+        assert [tuple(row) for row in res] == [(100, 1, 1, 0), (101, -1, 0, 1), (102, 0, 0, 0)]
+
+        await connection.rollback()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app')
+async def test_interrupted_migration_backfills_on_rerun() -> None:
+    await migrate(engine)
+    async with engine.begin() as connection:
+        await connection.execute(insert(User).values(id=200, username='rerun', password=''))
+        await connection.execute(insert(Publication).values(id=200, text='', author_id=200))
+        await connection.execute(insert(Vote).values(user_id=200, publication_id=200, value=1))
+        # The columns were added but the run failed before recording the migration
+        await connection.execute(update(Publication).where(Publication.id == 200).values(rating=0, likes=0))
+        await connection.execute(delete(schema_migrations))
+
+    try:
+        assert await migrate(engine) == [migration.VERSION for migration in MIGRATIONS]
+
+        async with engine.connect() as connection:
+            res = await connection.execute(
+                select(Publication.rating, Publication.likes).where(Publication.id == 200),
+            )
+            assert tuple(res.one()) == (1, 1)
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(delete(Vote).where(Vote.user_id == 200))
+            await connection.execute(delete(Publication).where(Publication.id == 200))
+            await connection.execute(delete(User).where(User.id == 200))
@@ -1,20 +1,178 @@
-from typing import Dict
+from typing import Any, Awaitable, Callable, Dict, List
+
+from redis.exceptions import ResponseError
+
+
+class TestRedisPipeline:
+    def __init__(self, client: 'TestRedisClient') -> None:
+        self.client = client
+        self.commands: List[Awaitable[Any]] = []
+
+    async def __aenter__(self) -> 'TestRedisPipeline':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.commands = []
+
+    def __getattr__(self, name: str) -> Callable[..., 'TestRedisPipeline']:
+        command = getattr(self.client, name)
+
+        def queue(*args: Any, **kwargs: Any) -> 'TestRedisPipeline':
+            self.commands.append(command(*args, **kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self.commands = self.commands, []
+        return [await command for command in commands]
 
 
 class TestRedisClient:
-    redis_data: Dict[str, str] = {}
+    redis_data: Dict[str, Any] = {}
+    sorted_sets: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def flush(cls) -> None:
+        cls.redis_data.clear()
+        cls.sorted_sets.clear()
 
     @classmethod
-    async def set(cls, key: str, payload: str, ex: None = None) -> None:
+    async def set(cls, key: str, payload: str, ex: None = None, px: None = None, nx: bool = False) -> bool | None:
+        if nx and key in cls.redis_data:
+            return None
         cls.redis_data[key] = payload
+        return True
 
     @classmethod
     async def get(cls, key: str) -> str | None:
         return cls.redis_data.get(key)
 
+    @classmethod
+    async def mget(cls, keys: List[str]) -> List[str | None]:
+        return [cls.redis_data.get(key) for key in keys]
+
+    @classmethod
+    async def incr(cls, key: str) -> int:
+        cls.redis_data[key] = int(cls.redis_data.get(key, 0)) + 1
+        return cls.redis_data[key]
+
+    @classmethod
+    async def eval(cls, script: str, numkeys: int, *keys_and_args: str) -> int:
+        # Only the compare-and-delete script releasing locks is emulated
+        key, token = keys_and_args
+        if cls.redis_data.get(key) == token:
+            return await cls.delete(key)
+        return 0
+
     @classmethod
     async def delete(cls, key: str) -> int:
         if key in cls.redis_data:
             cls.redis_data.pop(key)
             return 1
+        if key in cls.sorted_sets:
+            cls.sorted_sets.pop(key)
+            return 1
         return 0
+
+    @classmethod
+    async def unlink(cls, *keys: str) -> int:
+        return sum([await cls.delete(key) for key in keys])
+
+    @classmethod
+    async def sadd(cls, key: str, *members: str) -> int:
+        values = cls.redis_data.setdefault(key, set())
+        added = len(set(members) - values)
+        values.update(members)
+        return added
+
+    @classmethod
+    async def sismember(cls, key: str, member: str) -> bool:
+        return member in cls.redis_data.get(key, set())
+
+    @classmethod
+    async def publish(cls, channel: str, message: str) -> int:
+        return 0
+
+    @classmethod
+    async def rename(cls, src: str, dst: str) -> None:
+        if src in cls.sorted_sets:
+            cls.sorted_sets[dst] = cls.sorted_sets.pop(src)
+        else:
+            cls.redis_data[dst] = cls.redis_data.pop(src)
+
+    @classmethod
+    async def renamenx(cls, src: str, dst: str) -> bool:
+        if src not in cls.redis_data and src not in cls.sorted_sets:
+            raise ResponseError('no such key')
+        if dst in cls.redis_data or dst in cls.sorted_sets:
+            return False
+        await cls.rename(src, dst)
+        return True
+
+    @classmethod
+    async def hset(
+        cls, key: str, field: str | None = None, value: Any = None, mapping: Dict[str, Any] | None = None
+    ) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        hash_ = cls.redis_data.setdefault(key, {})
+        added = len(set(items) - set(hash_))
+        hash_.update({field: str(value) for field, value in items.items()})
+        return added
+
+    @classmethod
+    async def hdel(cls, key: str, *fields: str) -> int:
+        hash_ = cls.redis_data.get(key, {})
+        deleted = len([hash_.pop(field) for field in fields if field in hash_])
+        if key in cls.redis_data and not hash_:
+            cls.redis_data.pop(key)
+        return deleted
+
+    @classmethod
+    async def hgetall(cls, key: str) -> Dict[bytes, bytes]:
+        return {field.encode(): value.encode() for field, value in cls.redis_data.get(key, {}).items()}
+
+    @classmethod
+    async def hkeys(cls, key: str) -> List[bytes]:
+        return [field.encode() for field in cls.redis_data.get(key, {})]
+
+    @classmethod
+    async def exists(cls, *keys: str) -> int:
+        return len([key for key in keys if key in cls.redis_data or key in cls.sorted_sets])
+
+    @classmethod
+    def pipeline(cls, transaction: bool = True) -> TestRedisPipeline:
+        return TestRedisPipeline(cls())
+
+    @classmethod
+    async def zadd(cls, key: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        sorted_set = cls.sorted_sets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if member not in sorted_set:
+                added += 1
+            elif nx:
+                continue
+            sorted_set[member] = score
+        return added
+
+    @classmethod
+    async def zincrby(cls, key: str, amount: float, member: str) -> float:
+        sorted_set = cls.sorted_sets.setdefault(key, {})
+        sorted_set[member] = sorted_set.get(member, 0) + amount
+        return sorted_set[member]
+
+    @classmethod
+    async def zrem(cls, key: str, *members: str) -> int:
+        sorted_set = cls.sorted_sets.get(key, {})
+        return len([sorted_set.pop(member) for member in members if member in sorted_set])
+
+    @classmethod
+    async def zrevrange(cls, key: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        members = sorted(cls.sorted_sets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+        members = members[start : end + 1]
+        if withscores:
+            return [(member.encode(), score) for member, score in members]
+        return [member.encode() for member, _ in members]
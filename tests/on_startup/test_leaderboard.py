@@ -0,0 +1,25 @@
+import pytest
+
+from tests.mocking.redis import TestRedisClient
+
+from app.cache.leaderboard import acquire_rebuild_lock, leaderboard_is_built
+from app.db import redis
+from app.on_startup.leaderboard import start_leaderboard
+
+
+@pytest.fixture()
+def _mock_redis() -> None:
+    TestRedisClient.flush()
+    redis.redis = TestRedisClient()
+
+
+@pytest.mark.asyncio()
+@pytest.mark.usefixtures('app', '_mock_redis')
+async def test_start_leaderboard_once() -> None:
+    assert await acquire_rebuild_lock()
+
+    await start_leaderboard()
+    assert not await leaderboard_is_built()
+
+    await start_leaderboard(force=True)
+    assert await leaderboard_is_built()
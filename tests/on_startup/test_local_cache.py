@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+import pytest
+
+from app.cache.local import local_cache
+from app.on_startup import local_cache as local_cache_listener
+
+
+class FlakyPubSub:
+    def __init__(self, fail: bool, invalidated: asyncio.Event) -> None:
+        self.fail = fail
+        self.invalidated = invalidated
+
+    async def __aenter__(self) -> 'FlakyPubSub':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return
+
+    async def subscribe(self, channel: str) -> None:
+        if self.fail:
+            raise TimeoutError()
+
+    async def listen(self) -> AsyncIterator[dict[str, Any]]:
+        local_cache.set('key', b'value', 5)
+        yield {'data': b'key'}
+        self.invalidated.set()
+        await asyncio.Event().wait()
+
+
+class FlakyRedis:
+    def __init__(self) -> None:
+        self.subscriptions = 0
+        self.invalidated = asyncio.Event()
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> FlakyPubSub:
+        self.subscriptions += 1
+        return FlakyPubSub(self.subscriptions == 1, self.invalidated)
+
+
+@pytest.mark.asyncio()
+async def test_listen_invalidations_resubscribes_after_any_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    redis = FlakyRedis()
+    monkeypatch.setattr(local_cache_listener, 'get_redis', lambda: redis)
+
+    task = asyncio.create_task(local_cache_listener.listen_invalidations())
+    try:
+        await asyncio.wait_for(redis.invalidated.wait(), timeout=5)
+    finally:
+        task.cancel()
+
+    assert redis.subscriptions == 2
+    assert local_cache.get('key') is None
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import orjson
+import pytest
+from pydantic import BaseModel
+
+from app.models.publication.publication import Publication
+from app.models.publication.user import User
+from app.models.publication.vote import Vote
+from app.schema.auth.user import AuthorResponse, serialize_author
+from app.schema.publication.publication import PublicationDTO, serialize_publication
+from app.schema.serialization import Serializer
+
+
+def publication(publication_id: int) -> Publication:
+    return Publication(
+        id=publication_id,
+        text='text',
+        author_id=1,
+        publication_date=datetime(2023, 1, 2, 3, 4, 5, 600000),
+        rating=1,
+        likes=2,
+        dislikes=1,
+        votes=[
+            Vote(id=1, value=1, user_id=1, publication_id=publication_id),
+            Vote(id=2, value=1, user_id=2, publication_id=publication_id),
+            Vote(id=3, value=-1, user_id=3, publication_id=publication_id),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ('model', 'serialize', 'obj'),
+    [
+        (PublicationDTO, serialize_publication, publication(1)),
+        (
+            AuthorResponse,
+            serialize_author,
+            User(id=1, username='author', password='', publications=[publication(1), publication(2)]),
+        ),
+    ],
+)
+def test_trusted_serializer_matches_pydantic(model: type[BaseModel], serialize: Serializer, obj: object) -> None:
+    expected = orjson.dumps(model.model_validate(obj, from_attributes=True).model_dump(mode='json'))
+
+    assert orjson.dumps(serialize(obj)) == expected